@@ -4,6 +4,31 @@ local M = {}
 
 M.config = {
   pause_timeout_sec = 30,
+  -- how long a burst of player signals must settle before the statusline refreshes
+  refresh_quiet_window_ms = 50,
+  -- the playback position is interpolated locally; how often to correct it
+  position_drift_check_sec = 60,
+  -- width in cells of the bar drawn by the progress component
+  progress_bar_width = 10,
+  -- held :SpotifySeek/:SpotifyVolume keys send at most one call per interval,
+  -- carrying every press made in between
+  adjust_interval_ms = 100,
+  -- share one player connection between all Neovim instances through a broker
+  -- process (`python -m spotify.broker`), started on demand when none is running
+  broker = false,
+  -- MPRIS players to follow, by the name after org.mpris.MediaPlayer2., e.g.
+  -- { "spotify", "spotifyd" }; nil follows every player and shows the one that
+  -- started playing most recently
+  players = nil,
+  -- level of the log, stdpath("log")/spotify/plugin.<pid>.log for each Neovim instance:
+  -- "debug", "info", "warning" or "error"
+  log_level = "info",
+  -- record spans of every update from signal to redraw from startup on; dump
+  -- them for chrome://tracing or Perfetto with :SpotifyTrace dump
+  trace = false,
+  -- sample how late the plugin's event loop runs scheduled work from startup
+  -- on, shown by :SpotifyLoopLag; off, sampling starts with :SpotifyLoopLag start
+  loop_lag = false,
   icons = {
     playing = icons.misc.music,
     paused = icons.misc.pause,
@@ -14,7 +39,29 @@ function M.get_config()
   return M.config
 end
 
-M.current_track = ""
+-- display state mirrored from the plugin, which only sends the fields that
+-- changed; statusline components, winbars and floats can read it during redraw
+-- without calling back into Python. `position` and `length` are in seconds.
+M.state = {
+  text = "",
+  icon = "",
+  progress = "",
+  status = "",
+  artist = "",
+  title = "",
+  album = "",
+  shuffle = false,
+  loop = "",
+  volume = 0,
+  position = 0,
+  length = 0,
+  can_control = false,
+  can_go_next = false,
+  can_go_previous = false,
+  can_play = false,
+  can_pause = false,
+  can_seek = false,
+}
 
 function M.format_track(status, track_info)
   if not track_info then
@@ -30,17 +77,70 @@ function M.format_track(status, track_info)
   return ""
 end
 
-function M.update_track(track_text)
-  vim.notify(track_text)
-  if M.current_track ~= track_text then
-    M.current_track = track_text
+-- redraws timed while the plugin traces (:SpotifyTrace start), as Chrome trace
+-- events in microseconds of vim.uv.hrtime(); collected by :SpotifyTrace dump
+M.trace_events = {}
+local max_trace_events = 2000
+
+local function trace_event(name, start, stop, updates)
+  if #M.trace_events >= max_trace_events then
+    table.remove(M.trace_events, 1)
+  end
+  table.insert(M.trace_events, {
+    name = name,
+    cat = "lua",
+    ph = "X",
+    ts = start / 1000,
+    dur = (stop - start) / 1000,
+    args = { updates = updates },
+  })
+end
 
-    if package.loaded.lualine then
-      vim.schedule(function()
-        pcall(require("lualine").refresh)
-      end)
-    end
+-- merge the changed display fields sent by the plugin in its single RPC;
+-- `trace` lists the traced updates they carry while tracing is on
+function M.update(changes, trace)
+  for key, value in pairs(changes) do
+    M.state[key] = value
   end
+
+  if package.loaded.lualine then
+    local scheduled = trace and vim.uv.hrtime()
+    vim.schedule(function()
+      local started = trace and vim.uv.hrtime()
+      pcall(require("lualine").refresh)
+      if trace then
+        trace_event("vim.schedule", scheduled, started, trace)
+        trace_event("lualine.refresh", started, vim.uv.hrtime(), trace)
+      end
+    end)
+  end
+end
+
+function M.take_trace_events()
+  local events = M.trace_events
+  M.trace_events = {}
+  return events
+end
+
+-- statusline component: the formatted track, e.g. "▶ Queen - Bohemian Rhapsody"
+function M.track()
+  return M.state.text
+end
+
+-- statusline/winbar component: elapsed / total and a progress bar
+function M.progress()
+  return M.state.progress
+end
+
+-- let the plugin stop redrawing the progress while Neovim is in the background
+function M.track_focus()
+  local group = vim.api.nvim_create_augroup("SpotifyFocus", { clear = true })
+  vim.api.nvim_create_autocmd({ "FocusGained", "FocusLost" }, {
+    group = group,
+    callback = function(ev)
+      pcall(vim.fn.SpotifyFocus, ev.event == "FocusGained")
+    end,
+  })
 end
 
 function M.setup(opts)
@@ -0,0 +1,6 @@
+"""
+Standalone benchmarks for the Spotify remote plugin.
+
+Run from `rplugin/python3` so the package resolves, e.g.
+`python -m spotify.benchmarks.refresh`.
+"""
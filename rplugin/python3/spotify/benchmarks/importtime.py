@@ -0,0 +1,89 @@
+"""
+Measure what `import spotify` costs the remote-plugin host and check it
+against the budget in `[tool.spotify-nvim.import-budget]` of pyproject.toml.
+
+Each run is a fresh interpreter under `python -X importtime`. pynvim is
+imported first because the host has always loaded it already, so only the
+plugin's own cost is attributed to `spotify`. Exits non-zero if the median
+cumulative time exceeds the budget or a forbidden module gets imported.
+
+    python -m spotify.benchmarks.importtime --runs 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tomllib
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+
+
+def load_budget() -> tuple[float, list[str]]:
+    with open(PACKAGE_DIR / "pyproject.toml", "rb") as f:
+        budget = tomllib.load(f)["tool"]["spotify-nvim"]["import-budget"]
+    return float(budget["cumulative_ms"]), list(budget["forbidden"])
+
+
+def import_once() -> dict[str, tuple[int, int]]:
+    """Return {module: (self_us, cumulative_us)} for one cold `import spotify`."""
+    env = dict(os.environ)
+    # Measure with bytecode caching on, as the host would run
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pynvim; import spotify"],
+        cwd=PACKAGE_DIR.parent,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main(args: argparse.Namespace) -> int:
+    budget_ms, forbidden = load_budget()
+    import_once()  # warm the bytecode cache
+
+    samples: list[float] = []
+    imported: set[str] = set()
+    for _ in range(args.runs):
+        timings = import_once()
+        samples.append(timings["spotify"][1] / 1000)
+        imported.update(timings)
+
+    median = statistics.median(samples)
+    print(
+        f"import spotify: median={median:.2f}ms min={min(samples):.2f}ms "
+        f"max={max(samples):.2f}ms budget={budget_ms:.2f}ms ({args.runs} runs)"
+    )
+
+    leaked = sorted(
+        name
+        for name in imported
+        if any(name == f or name.startswith(f"{f}.") for f in forbidden)
+    )
+    failed = False
+    if leaked:
+        print(f"FAIL: forbidden modules imported: {', '.join(leaked)}")
+        failed = True
+    if median > budget_ms:
+        print(f"FAIL: median import time {median:.2f}ms exceeds budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=15)
+    sys.exit(main(parser.parse_args()))
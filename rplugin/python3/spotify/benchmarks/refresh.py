@@ -0,0 +1,155 @@
+"""
+Compare player-state refresh latency between the legacy sequential getters,
+the concurrent per-property fallback and the batched Properties.GetAll path.
+
+By default the player is simulated in-process with a fixed round-trip time per
+D-Bus call, which isolates the cost of the call pattern itself. Pass `--live` to
+benchmark against a running player on the session bus instead.
+
+    python -m spotify.benchmarks.refresh --rtt-ms 0.5 --iterations 200
+    python -m spotify.benchmarks.refresh --live --service spotifyd
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+from typing import cast
+
+from dbus_fast.signature import Variant
+
+from ..interface import AsyncPlayerInterface
+from ..interface import AsyncPropertiesInterface
+from ..interface import Spotify
+from ..interface import SpotifyService
+from ..models import LoopStatus
+from ..models import PlaybackStatus
+from ..models import PlayerState
+
+METADATA = {
+    "mpris:trackid": Variant("o", "/com/spotify/track/4u7EnebtmKWzUH433cf5Qv"),
+    "mpris:length": Variant("t", 354_000_000),
+    "mpris:artUrl": Variant("s", "https://i.scdn.co/image/ab67616d0000b273"),
+    "xesam:title": Variant("s", "Bohemian Rhapsody"),
+    "xesam:artist": Variant("as", ["Queen"]),
+    "xesam:album": Variant("s", "A Night at the Opera"),
+    "xesam:albumArtist": Variant("as", ["Queen"]),
+    "xesam:url": Variant("s", "https://open.spotify.com/track/4u7EnebtmKWzUH433cf5Qv"),
+    "xesam:discNumber": Variant("i", 1),
+    "xesam:trackNumber": Variant("i", 11),
+}
+
+PROPERTIES = {
+    "PlaybackStatus": Variant("s", "Playing"),
+    "LoopStatus": Variant("s", "None"),
+    "Rate": Variant("d", 1.0),
+    "Shuffle": Variant("b", False),
+    "Metadata": Variant("a{sv}", METADATA),
+    "Volume": Variant("d", 0.8),
+    "Position": Variant("x", 12_000_000),
+    "MinimumRate": Variant("d", 1.0),
+    "MaximumRate": Variant("d", 1.0),
+    "CanGoNext": Variant("b", True),
+    "CanGoPrevious": Variant("b", True),
+    "CanPlay": Variant("b", True),
+    "CanPause": Variant("b", True),
+    "CanSeek": Variant("b", True),
+    "CanControl": Variant("b", True),
+}
+
+
+class SimulatedPlayer:
+    """Answers MPRIS getters after a fixed delay, like a bus round trip would."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.calls = 0
+
+    async def _reply(self, name: str) -> Any:
+        self.calls += 1
+        await asyncio.sleep(self.rtt)
+        return PROPERTIES[name].value
+
+    def __getattr__(self, attr: str) -> Callable[[], Awaitable[Any]]:
+        name = "".join(part.title() for part in attr.removeprefix("get_").split("_"))
+        return lambda: self._reply(name)
+
+    async def call_get_all(self, interface_name: str) -> dict[str, Variant]:
+        self.calls += 1
+        await asyncio.sleep(self.rtt)
+        return dict(PROPERTIES)
+
+
+async def legacy_getplayer_state(spotify: Spotify) -> PlayerState:
+    """The pre-GetAll implementation: twelve getters awaited one after another."""
+    player = spotify.player
+    return PlayerState(
+        playback_status=PlaybackStatus(await player.get_playback_status()),
+        loop_status=LoopStatus(await player.get_loop_status()),
+        shuffle=await player.get_shuffle(),
+        volume=await player.get_volume(),
+        position=await player.get_position(),
+        metadata=await spotify.get_metadata(),
+        can_control=await player.get_can_control(),
+        can_go_next=await player.get_can_go_next(),
+        can_go_previous=await player.get_can_go_previous(),
+        can_play=await player.get_can_play(),
+        can_pause=await player.get_can_pause(),
+        can_seek=await player.get_can_seek(),
+    )
+
+
+async def measure(
+    name: str, fetch: Callable[[], Awaitable[PlayerState]], iterations: int
+) -> None:
+    await fetch()  # warm up
+    samples: list[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fetch()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{name:<12} mean={statistics.fmean(samples):8.3f}ms "
+        f"p50={statistics.median(samples):8.3f}ms p95={p95:8.3f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    spotify = Spotify(service=SpotifyService(args.service))
+    if args.live:
+        await spotify.ensure_connected()
+        print(f"live: {spotify._service}")  # pyright: ignore[reportPrivateUsage]
+    else:
+        simulated = SimulatedPlayer(args.rtt_ms / 1000)
+        spotify._player = cast(AsyncPlayerInterface, cast(object, simulated))  # pyright: ignore[reportPrivateUsage]
+        spotify._properties = cast(AsyncPropertiesInterface, cast(object, simulated))  # pyright: ignore[reportPrivateUsage]
+        print(f"simulated: rtt={args.rtt_ms}ms per D-Bus call")
+
+    try:
+        await measure(
+            "sequential", lambda: legacy_getplayer_state(spotify), args.iterations
+        )
+        await measure("concurrent", spotify.getplayer_state_concurrent, args.iterations)
+        await measure("get_all", spotify.getplayer_state, args.iterations)
+    finally:
+        await spotify.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.3)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument(
+        "--service",
+        choices=[service.value for service in SpotifyService],
+        default=SpotifyService.DESKTOP.value,
+    )
+    asyncio.run(main(parser.parse_args()))
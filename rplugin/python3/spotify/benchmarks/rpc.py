@@ -0,0 +1,128 @@
+"""
+Count the msgpack-RPC round trips from the plugin to Neovim per track change.
+
+Neovim is replaced by a recorder that counts every request the plugin sends.
+`async_call` is run inline since scheduling onto the main thread costs no RPC
+of its own. The legacy figure replays the former update sequence: requiring
+lib.spotify, calling update_track, then pushing the progress separately.
+For the batched path it also reports how many display fields each push carries,
+since only the fields that changed since the previous push are sent.
+
+The plugin still connects to the session bus on startup, so run it without a
+player on the bus to keep signals from adding updates of their own.
+
+    python -m spotify.benchmarks.rpc --changes 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import Any
+from typing import cast
+
+import pynvim
+from dbus_fast.signature import Variant
+
+from ..plugin import SpotifyNvimPlugin
+from ..snapshot import PlayerSnapshot
+from .refresh import METADATA
+from .refresh import PROPERTIES
+
+
+class _LuaNamespace:
+    """Mimics `nvim.lua.<module>.<fn>(...)`, which pynvim sends as one exec_lua."""
+
+    def __init__(self, nvim: RecordingNvim):
+        self._nvim = nvim
+
+    def __getattr__(self, name: str) -> Any:
+        return self
+
+    def __call__(self, *args: Any) -> None:
+        self._nvim.requests["nvim_exec_lua"] += 1
+
+
+class RecordingNvim:
+    """Stands in for pynvim.Nvim and counts the requests made through it."""
+
+    def __init__(self):
+        self.requests: Counter[str] = Counter()
+        self.fields = 0
+        self.lua = _LuaNamespace(self)
+
+    def exec_lua(self, code: str, *args: Any) -> Any:
+        self.requests["nvim_exec_lua"] += 1
+        if args and isinstance(args[0], dict):
+            self.fields += len(cast(dict[str, Any], args[0]))
+        return {} if "get_config" in code else None
+
+    def err_write(self, msg: str) -> None:
+        self.requests["nvim_err_write"] += 1
+
+    def async_call(self, fn: Any, *args: Any) -> None:
+        fn(*args)
+
+    def reset(self) -> None:
+        self.requests.clear()
+        self.fields = 0
+
+
+def track(index: int) -> PlayerSnapshot:
+    metadata = {
+        **METADATA,
+        "mpris:trackid": Variant("o", f"/com/spotify/track/{index}"),
+        "xesam:title": Variant("s", f"Track {index}"),
+    }
+    return PlayerSnapshot.from_dbus_dict(
+        {**PROPERTIES, "Metadata": Variant("a{sv}", metadata)}
+    )
+
+
+def legacy_update(nvim: RecordingNvim, text: str, progress: str) -> None:
+    """The former per-update sequence of _update_nvim_state and the progress push."""
+    nvim.exec_lua("spotify = require('lib.spotify')")
+    nvim.lua.spotify.update_track(text)
+    nvim.exec_lua('require("lib.spotify").update_progress(...)', progress)
+
+
+async def track_change(plugin: SpotifyNvimPlugin, snapshot: PlayerSnapshot) -> None:
+    plugin.store.replace(snapshot)
+    plugin._render_state(snapshot)  # pyright: ignore[reportPrivateUsage]
+    await asyncio.sleep(0)  # let the batched display flush run
+
+
+def report(name: str, requests: Counter[str], changes: int) -> None:
+    total = sum(requests.values())
+    breakdown = ", ".join(f"{method}={count}" for method, count in requests.items())
+    print(f"{name:<8} {total / changes:5.2f} RPCs per track change ({breakdown})")
+
+
+def main(args: argparse.Namespace) -> None:
+    nvim = RecordingNvim()
+
+    for index in range(args.changes):
+        legacy_update(nvim, f"▶ Queen - Track {index}", "0:12 / 5:54")
+    report("legacy", nvim.requests, args.changes)
+    nvim.reset()
+
+    plugin = SpotifyNvimPlugin(cast(pynvim.Nvim, nvim))
+    while not plugin._ready:  # pyright: ignore[reportPrivateUsage]
+        time.sleep(0.01)
+    nvim.reset()
+    try:
+        for index in range(args.changes):
+            plugin.runner.run_coroutine_sync(track_change(plugin, track(index)))
+        report("batched", nvim.requests, args.changes)
+        pushes = nvim.requests["nvim_exec_lua"] or 1
+        print(f"{'':<8} {nvim.fields / pushes:5.2f} display fields per push")
+    finally:
+        plugin.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--changes", type=int, default=200)
+    main(parser.parse_args())
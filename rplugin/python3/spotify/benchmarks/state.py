@@ -0,0 +1,99 @@
+"""
+Per-update CPU and allocation cost of the pydantic PlayerState models versus
+the __slots__ PlayerSnapshot used on the internal signal-to-statusline path.
+
+Each case is measured for a full build from a GetAll reply and for merging the
+two common PropertiesChanged deltas (a PlaybackStatus flip and a track change).
+
+    python -m spotify.benchmarks.state --iterations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from dbus_fast.signature import Variant
+
+from ..models import PlayerState
+from ..snapshot import PlayerSnapshot
+from .refresh import METADATA
+from .refresh import PROPERTIES
+
+STATUS_CHANGE = {"PlaybackStatus": Variant("s", "Paused")}
+TRACK_CHANGE = {
+    "Metadata": Variant(
+        "a{sv}",
+        {
+            **METADATA,
+            "mpris:trackid": Variant("o", "/com/spotify/track/7tFiyTwD0nx5a1eklYtX2J"),
+            "xesam:title": Variant("s", "Don't Stop Me Now"),
+            "xesam:album": Variant("s", "Jazz"),
+        },
+    )
+}
+
+
+def cpu_us(op: Callable[[], Any], iterations: int) -> float:
+    return min(timeit.repeat(op, number=iterations, repeat=5)) / iterations * 1e6
+
+
+def allocated_bytes(op: Callable[[], Any], iterations: int) -> tuple[float, float]:
+    """Return (retained bytes per result, peak transient bytes for one call)."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        op()
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+
+        before, _ = tracemalloc.get_traced_memory()
+        results = [op() for _ in range(iterations)]
+        after, _ = tracemalloc.get_traced_memory()
+        retained = (after - before) / len(results)
+    finally:
+        tracemalloc.stop()
+    return retained, peak - before
+
+
+def main(args: argparse.Namespace) -> None:
+    model = PlayerState.from_dbus_dict(PROPERTIES)
+    snapshot = PlayerSnapshot.from_dbus_dict(PROPERTIES)
+    cases: list[tuple[str, Callable[[], Any], Callable[[], Any]]] = [
+        (
+            "full build",
+            lambda: PlayerState.from_dbus_dict(PROPERTIES),
+            lambda: PlayerSnapshot.from_dbus_dict(PROPERTIES),
+        ),
+        (
+            "status delta",
+            lambda: model.with_dbus_changes(STATUS_CHANGE),
+            lambda: snapshot.with_dbus_changes(STATUS_CHANGE),
+        ),
+        (
+            "track delta",
+            lambda: model.with_dbus_changes(TRACK_CHANGE),
+            lambda: snapshot.with_dbus_changes(TRACK_CHANGE),
+        ),
+    ]
+
+    print(f"{'case':<14}{'impl':<10}{'cpu/op':>12}{'retained/op':>14}{'peak/op':>12}")
+    for name, pydantic_op, snapshot_op in cases:
+        for impl, op in (("pydantic", pydantic_op), ("snapshot", snapshot_op)):
+            cpu = cpu_us(op, args.iterations)
+            retained, peak = allocated_bytes(op, min(args.iterations, 2000))
+            print(
+                f"{name:<14}{impl:<10}{cpu:>10.2f}us{retained:>12.0f} B{peak:>10.0f} B"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    main(parser.parse_args())
@@ -0,0 +1,650 @@
+"""
+Per-user broker sharing one Spotify connection between Neovim instances.
+
+When enabled, the broker holds the only bus connection and the authoritative
+player state, answers snapshot and command requests, and forwards every Player
+PropertiesChanged and Seeked signal to its clients as a compact delta over a
+Unix socket. Messages are newline-delimited JSON:
+
+    client -> broker  {"id": 1, "op": "snapshot", "args": []}
+    broker -> client  {"id": 1, "result": {...}}  or  {"id": 1, "error": {...}}
+                      where an error has a "text", plus a "dbus" error name for
+                      D-Bus errors and a "kind" for the plugin's own exceptions
+    broker -> client  {"event": "changed", "interface": ..., "changed": {...},
+                       "invalidated": [...]}
+    broker -> client  {"event": "seeked", "position": 12000000}
+    broker -> client  {"event": "owner", "name": ..., "old": ..., "new": ...}
+
+Run it standalone with `python -m spotify.broker`, or let BrokerClient spawn it
+on first use.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import fcntl
+import json
+import logging
+import os
+import subprocess
+import sys
+from itertools import count
+from pathlib import Path
+from typing import Any
+from typing import final
+
+from dbus_fast.errors import DBusError
+from dbus_fast.signature import Variant
+
+from .interface import PlayerNotRunning
+from .interface import Spotify
+from .interface import SpotifyService
+from .introspection import IntrospectionCache
+from .introspection import default_cache_path
+from .logs import PluginLogging
+from .metrics import CallMetrics
+from .snapshot import PlayerSnapshot
+from .store import PlayerStateStore
+from .subscriptions import NameOwnerChangedHandler
+from .subscriptions import PropertiesChangedHandler
+from .subscriptions import SeekedHandler
+from .supervisor import ConnectionSupervisor
+from .supervisor import PlayerUnavailable
+
+# Not __name__: run with -m that is __main__, outside the package logger
+logger = logging.getLogger("spotify.broker")
+
+# Spotify methods clients may invoke through the broker, by wire op name
+COMMANDS = frozenset(
+    {
+        "play",
+        "pause",
+        "stop",
+        "next_track",
+        "previous_track",
+        "toggle_playback",
+        "toggle_shuffle",
+        "seek",
+        "set_position",
+        "set_volume",
+    }
+)
+
+# Clients that stop reading are dropped once this much output is queued for them
+MAX_CLIENT_BUFFER = 1 << 20
+
+
+def default_socket_path() -> Path:
+    """`$XDG_RUNTIME_DIR/nvim-spotify.sock`, or a per-user path in /tmp."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "nvim-spotify.sock"
+    return Path(f"/tmp/nvim-spotify-{os.getuid()}.sock")
+
+
+def unwrap(value: Any) -> Any:
+    """Strip dbus_fast Variants recursively, leaving JSON-serializable values."""
+    if type(value) is Variant:
+        return unwrap(value.value)
+    if isinstance(value, dict):
+        return {key: unwrap(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [unwrap(item) for item in value]
+    return value
+
+
+def encode(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class BrokerError(RuntimeError):
+    """A request failed in the broker for a reason other than a D-Bus error."""
+
+
+@final
+class Broker:
+    """Serves one shared Spotify connection to BrokerClients over a Unix socket."""
+
+    def __init__(
+        self,
+        service: SpotifyService = SpotifyService.DESKTOP,
+        path: Path | None = None,
+        idle_timeout: float = 0.0,
+    ):
+        """
+        Args:
+            service: The MPRIS player to connect to.
+            path: Socket path, defaults to default_socket_path().
+            idle_timeout: Seconds without clients before the broker exits;
+                          0 keeps it running until it is killed.
+        """
+        self.path = path or default_socket_path()
+        self.idle_timeout = idle_timeout
+        self.spotify = Spotify(
+            service=service,
+            introspection_cache=IntrospectionCache(default_cache_path()),
+        )
+        self.spotify.add_properties_changed_handler(self._on_properties_changed)
+        self.spotify.add_seeked_handler(self._on_seeked)
+        self.spotify.add_name_owner_changed_handler(self._on_name_owner_changed)
+        self.store = PlayerStateStore()
+        # Wire form of the stored state, kept current from the same deltas
+        self.properties: dict[str, Any] = {}
+        self._fetch: asyncio.Future[None] | None = None
+        self._clients: set[asyncio.StreamWriter] = set()
+        self._idle_timer: asyncio.TimerHandle | None = None
+        self._done: asyncio.Event | None = None
+        self._supervisor: ConnectionSupervisor | None = None
+        # Held while this broker runs, see _lock()
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._lock_fd: int | None = None
+
+        self.requests = 0
+        self.fetches = 0
+        self.published = 0
+
+    async def serve(self) -> None:
+        """Listen until the idle timeout expires or the task is cancelled."""
+        self._done = asyncio.Event()
+        if not await self._lock():
+            logger.info("A broker is already listening on %s.", self.path)
+            return
+        supervisor = ConnectionSupervisor(self.spotify, asyncio.get_running_loop())
+        self._supervisor = supervisor
+        # Left behind by a broker that died; with the lock, nothing else binds it
+        with contextlib.suppress(FileNotFoundError):
+            self.path.unlink()
+        server = await asyncio.start_unix_server(self._handle_client, path=self.path)
+        self.path.chmod(0o600)
+        inode = self.path.stat().st_ino
+        logger.info("Broker listening on %s.", self.path)
+        self._arm_idle_timer()
+        try:
+            async with server:
+                await self._done.wait()
+        finally:
+            supervisor.stop()
+            with contextlib.suppress(FileNotFoundError):
+                if self.path.stat().st_ino == inode:
+                    self.path.unlink()
+            await self.spotify.disconnect()
+            self._unlock()
+            logger.info("Broker stopped: %s", self.stats())
+
+    async def _lock(self, timeout: float = 5.0) -> bool:
+        """
+        Take the lock file next to the socket, which a broker holds for as long
+        as it runs, so clients spawning brokers at the same time start only one.
+
+        Returns:
+            False if another broker holds the lock and is listening, or still
+            holds it after `timeout` seconds.
+        """
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # The holder is either serving, starting up or shutting down
+                if await _is_listening(self.path) or loop.time() >= deadline:
+                    os.close(fd)
+                    return False
+                await asyncio.sleep(0.05)
+            else:
+                self._lock_fd = fd
+                return True
+
+    def _unlock(self) -> None:
+        # The lock file stays: unlinking it would let two brokers lock two files
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self._clients.add(writer)
+        self._cancel_idle_timer()
+        logger.info("Client connected (%d total).", len(self._clients))
+        # Requests run concurrently, so a slow fetch doesn't hold up a command;
+        # replies carry the request id and may go out in any order
+        tasks: set[asyncio.Task[None]] = set()
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    # No id to answer; treated like malformed JSON
+                    logger.warning(
+                        "Dropping client: request %.80r is not an object", request
+                    )
+                    break
+                task = asyncio.create_task(self._reply(writer, request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            logger.warning("Dropping client: %s", e)
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._clients.discard(writer)
+            writer.close()
+            logger.info("Client disconnected (%d left).", len(self._clients))
+            if not self._clients:
+                self._arm_idle_timer()
+
+    async def _reply(
+        self, writer: asyncio.StreamWriter, request: dict[str, Any]
+    ) -> None:
+        reply = await self._respond(request)
+        if not writer.is_closing():
+            writer.write(encode(reply))
+
+    async def _respond(self, request: dict[str, Any]) -> dict[str, Any]:
+        self.requests += 1
+        reply: dict[str, Any] = {"id": request.get("id")}
+        try:
+            reply["result"] = await self._dispatch(
+                request.get("op", ""), request.get("args", [])
+            )
+        except PlayerNotRunning as e:
+            reply["error"] = {"kind": "not_running", "dbus": e.type, "text": e.text}
+        except DBusError as e:
+            reply["error"] = {"dbus": e.type, "text": e.text}
+        except PlayerUnavailable as e:
+            # Waiting out a reconnect backoff; expected while the player is away
+            reply["error"] = {"kind": "unavailable", "text": str(e)}
+        except Exception as e:
+            logger.exception("Request %s failed:", request)
+            reply["error"] = {"text": f"{type(e).__name__}: {e}"}
+        return reply
+
+    async def _dispatch(self, op: str, args: list[Any]) -> Any:
+        if op == "snapshot":
+            return await self._snapshot()
+        spotify = await self._ensure_connected()
+        if op == "position":
+            return await spotify.get_position()
+        if op in COMMANDS:
+            return await getattr(spotify, op)(*args)
+        raise BrokerError(f"Unknown op {op!r}")
+
+    async def _snapshot(self) -> dict[str, Any]:
+        """The stored state in wire form, fetched once for all waiting clients."""
+        if self.store.state is None:
+            if self._fetch is None or self._fetch.done():
+                self._fetch = asyncio.ensure_future(self._fetch_properties())
+            await asyncio.shield(self._fetch)
+        return {**self.properties, "Position": self.store.clock.position()}
+
+    async def _ensure_connected(self) -> Spotify:
+        assert self._supervisor is not None, "serve() has not been started"
+        return await self._supervisor.ensure_connected()
+
+    async def _fetch_properties(self) -> None:
+        spotify = await self._ensure_connected()
+        properties = unwrap(await spotify.get_properties())
+        self.fetches += 1
+        self.properties = properties
+        self.store.replace(PlayerSnapshot.from_dbus_dict(properties))
+
+    def _on_properties_changed(
+        self,
+        interface_name: str,
+        changed_properties: dict[str, Any],
+        invalidated_properties: list[str],
+    ) -> None:
+        if interface_name != self.spotify.PLAYER:
+            return
+        changed = unwrap(changed_properties)
+        if self.store.apply_changes(changed, invalidated_properties):
+            self.properties.update(changed)
+        else:
+            # Refetched on the next snapshot request
+            self.store.clear()
+            self.properties = {}
+        self._publish(
+            {
+                "event": "changed",
+                "interface": interface_name,
+                "changed": changed,
+                "invalidated": invalidated_properties,
+            }
+        )
+
+    def _on_seeked(self, position: int) -> None:
+        self.store.seeked(position)
+        self._publish({"event": "seeked", "position": position})
+
+    def _on_name_owner_changed(self, name: str, old_owner: str, new_owner: str) -> None:
+        # Whatever is stored belongs to the previous player instance
+        self.store.clear()
+        self.properties = {}
+        self._publish(
+            {"event": "owner", "name": name, "old": old_owner, "new": new_owner}
+        )
+
+    def _publish(self, message: dict[str, Any]) -> None:
+        data = encode(message)
+        for writer in list(self._clients):
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                logger.warning("Dropping a client that stopped reading.")
+                self._clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(data)
+        self.published += 1
+
+    def _arm_idle_timer(self) -> None:
+        if self.idle_timeout > 0 and self._done is not None:
+            self._cancel_idle_timer()
+            self._idle_timer = asyncio.get_running_loop().call_later(
+                self.idle_timeout, self._done.set
+            )
+
+    def _cancel_idle_timer(self) -> None:
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "clients": len(self._clients),
+            "requests": self.requests,
+            "fetches": self.fetches,
+            "published": self.published,
+            "merged_signals": self.store.merged_signals,
+            **self.spotify.signal_stats(),
+        }
+
+
+async def _is_listening(path: Path) -> bool:
+    try:
+        _, writer = await asyncio.open_unix_connection(path)
+    except OSError:
+        return False
+    writer.close()
+    return True
+
+
+@final
+class BrokerClient:
+    """
+    Thin subscriber that stands in for Spotify inside the plugin: requests and
+    commands go to the broker, and its forwarded signals reach the registered
+    handlers exactly as the D-Bus signals would.
+    """
+
+    PLAYER = Spotify.PLAYER
+
+    def __init__(
+        self,
+        service: SpotifyService = SpotifyService.DESKTOP,
+        path: Path | None = None,
+        spawn: bool = True,
+        log_level: str = "info",
+    ):
+        """
+        Args:
+            service: The player the broker should connect to if it is spawned.
+            path: Socket path, defaults to default_socket_path().
+            spawn: Start a broker process when none is listening.
+            log_level: Level of the log a spawned broker writes.
+        """
+        self._service = service
+        self.path = path or default_socket_path()
+        self.spawn = spawn
+        self.log_level = log_level
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._read_task: asyncio.Task[None] | None = None
+        self._ids = count(1)
+        self._pending: dict[int, asyncio.Future[Any]] = {}
+        self._connect_lock = asyncio.Lock()
+        self._properties_changed_handlers: list[PropertiesChangedHandler] = []
+        self._seeked_handlers: list[SeekedHandler] = []
+        self._name_owner_changed_handlers: list[NameOwnerChangedHandler] = []
+        # Round trips through the broker by operation, and connecting to it
+        self.metrics = CallMetrics()
+        self.received = 0
+        self.acted = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def service(self) -> SpotifyService:
+        return self._service
+
+    async def ensure_connected(self) -> BrokerClient:
+        if self.connected:
+            return self
+        async with self._connect_lock:
+            if not self.connected:
+                with self.metrics.timed("connect"):
+                    await self._connect()
+        return self
+
+    async def _connect(self) -> None:
+        try:
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not self.spawn:
+                raise
+            self._spawn_broker()
+            self._reader, self._writer = await self._wait_for_broker()
+        self._read_task = asyncio.get_running_loop().create_task(self._read_loop())
+        logger.info("Connected to broker at %s.", self.path)
+
+    def _spawn_broker(self) -> None:
+        logger.info("No broker on %s; starting one.", self.path)
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "spotify.broker",
+                "--socket",
+                str(self.path),
+                "--service",
+                self._service.value,
+                "--idle-timeout",
+                "60",
+                "--log-level",
+                self.log_level,
+            ],
+            cwd=Path(__file__).parent.parent,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+    async def _wait_for_broker(
+        self, timeout: float = 5.0
+    ) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        async with asyncio.timeout(timeout):
+            while True:
+                try:
+                    return await asyncio.open_unix_connection(self.path)
+                except (FileNotFoundError, ConnectionRefusedError):
+                    await asyncio.sleep(0.05)
+
+    async def _read_loop(self) -> None:
+        assert self._reader is not None
+        lost = True
+        try:
+            while line := await self._reader.readline():
+                self._dispatch(json.loads(line))
+        except (ConnectionError, json.JSONDecodeError) as e:
+            logger.warning("Broker connection failed: %s", e)
+        except asyncio.CancelledError:
+            # disconnect() closing on purpose
+            lost = False
+            raise
+        finally:
+            logger.info("Disconnected from broker.")
+            self._close()
+            if lost:
+                self._broker_lost()
+
+    def _broker_lost(self) -> None:
+        """
+        Report the broker going away as an owner change, so handlers resync
+        with a full fetch, which reconnects or spawns a new broker.
+        """
+        name = str(self._service)
+        for handler in self._name_owner_changed_handlers:
+            handler(name, "", "")
+
+    def _dispatch(self, message: dict[str, Any]) -> None:
+        event = message.get("event")
+        if event is not None:
+            self.received += 1
+        if event == "changed":
+            self.acted += 1
+            for handler in self._properties_changed_handlers:
+                handler(
+                    message["interface"], message["changed"], message["invalidated"]
+                )
+        elif event == "seeked":
+            self.acted += 1
+            for handler in self._seeked_handlers:
+                handler(message["position"])
+        elif event == "owner":
+            self.acted += 1
+            for handler in self._name_owner_changed_handlers:
+                handler(message["name"], message["old"], message["new"])
+        elif event is not None:
+            logger.debug("Ignoring unknown broker event %r.", event)
+        else:
+            future = self._pending.pop(message["id"], None)
+            if future is None or future.done():
+                return
+            if "error" in message:
+                future.set_exception(self._error(message["error"]))
+            else:
+                future.set_result(message.get("result"))
+
+    def _error(self, error: dict[str, Any]) -> Exception:
+        """Rebuild a failed request's exception, keeping the types callers catch."""
+        kind = error.get("kind")
+        if kind == "not_running":
+            return PlayerNotRunning(str(self._service))
+        if kind == "unavailable":
+            return PlayerUnavailable(error["text"])
+        if "dbus" in error:
+            return DBusError(error["dbus"], error["text"])
+        return BrokerError(error["text"])
+
+    def _close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Broker connection closed"))
+        self._pending.clear()
+
+    async def _request(self, op: str, *args: Any) -> Any:
+        await self.ensure_connected()
+        assert self._writer is not None
+        request_id = next(self._ids)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            with self.metrics.timed(op):
+                self._writer.write(encode({"id": request_id, "op": op, "args": args}))
+                return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def disconnect(self) -> None:
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        self._close()
+
+    def add_properties_changed_handler(self, handler: PropertiesChangedHandler) -> None:
+        self._properties_changed_handlers.append(handler)
+
+    def add_seeked_handler(self, handler: SeekedHandler) -> None:
+        self._seeked_handlers.append(handler)
+
+    def add_name_owner_changed_handler(self, handler: NameOwnerChangedHandler) -> None:
+        self._name_owner_changed_handlers.append(handler)
+
+    def call_stats(self) -> dict[str, dict[str, int | float]]:
+        """Counts, failures and latency percentiles per request to the broker."""
+        return self.metrics.stats()
+
+    def signal_stats(self) -> dict[str, int]:
+        """Events forwarded by the broker versus events dispatched to handlers."""
+        return {"received": self.received, "acted": self.acted}
+
+    async def get_snapshot(self) -> PlayerSnapshot:
+        return PlayerSnapshot.from_dbus_dict(await self._request("snapshot"))
+
+    async def get_position(self) -> int:
+        return await self._request("position")
+
+    async def play(self) -> None:
+        await self._request("play")
+
+    async def pause(self) -> None:
+        await self._request("pause")
+
+    async def stop(self) -> None:
+        await self._request("stop")
+
+    async def next_track(self) -> None:
+        await self._request("next_track")
+
+    async def previous_track(self) -> None:
+        await self._request("previous_track")
+
+    async def toggle_playback(self) -> None:
+        await self._request("toggle_playback")
+
+    async def toggle_shuffle(self) -> None:
+        await self._request("toggle_shuffle")
+
+    async def seek(self, offset: int) -> None:
+        await self._request("seek", offset)
+
+    async def set_position(self, position: int, track_id: str | None = None) -> None:
+        await self._request("set_position", position, track_id)
+
+    async def set_volume(self, volume: float) -> None:
+        await self._request("set_volume", volume)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Share one Spotify connection between Neovim instances."
+    )
+    parser.add_argument("--socket", type=Path, default=None)
+    parser.add_argument(
+        "--service",
+        choices=[service.value for service in SpotifyService],
+        default=SpotifyService.DESKTOP.value,
+    )
+    parser.add_argument("--idle-timeout", type=float, default=0.0)
+    parser.add_argument("--log-file", default=None)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+
+    # Same queue and rotated file as the plugin, so a long-lived broker never
+    # writes to disk on its event loop nor grows its log without bound
+    PluginLogging(args.log_file, args.log_level, name="broker").start()
+    broker = Broker(SpotifyService(args.service), args.socket, args.idle_timeout)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(broker.serve())
+
+
+if __name__ == "__main__":
+    main()
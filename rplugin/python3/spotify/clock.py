@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from typing import final
+
+
+@final
+class PlaybackClock:
+    """
+    Local estimate of the playback position.
+
+    MPRIS never signals Position changes, so instead of polling the clock is
+    anchored on the last known position and extrapolated with the monotonic
+    clock, the playback rate and whether the player is playing. It is resynced
+    on Seeked signals, track changes and occasional drift checks.
+    """
+
+    def __init__(self, now: Callable[[], float] = time.monotonic):
+        self._now = now
+        self._anchor_position = 0  # microseconds
+        self._anchor_time = now()
+        self.playing = False
+        self.rate = 1.0
+        self.length = 0  # microseconds, 0 when unknown
+        self.resyncs = 0
+        self.last_drift = 0  # microseconds, measured minus extrapolated
+
+    def position(self) -> int:
+        """Current position in microseconds, clamped to the track length."""
+        position = self._anchor_position
+        if self.playing:
+            elapsed = self._now() - self._anchor_time
+            position += int(elapsed * self.rate * 1_000_000)
+        if self.length > 0:
+            position = min(position, self.length)
+        return max(0, position)
+
+    def seconds_until_next_second(self) -> float | None:
+        """
+        Wall-clock seconds until the position crosses its next whole second, or
+        None while it is not advancing.
+        """
+        if not self.playing or self.rate <= 0:
+            return None
+        position = self.position()
+        if self.length > 0 and position >= self.length:
+            return None
+        remaining = 1_000_000 - position % 1_000_000
+        return remaining / (self.rate * 1_000_000)
+
+    def sync(self, position: int) -> None:
+        """Re-anchor on a position reported by the player."""
+        self._anchor_position = position
+        self._anchor_time = self._now()
+        self.resyncs += 1
+
+    def check_drift(self, position: int) -> int:
+        """Record how far the estimate was off from `position`, then resync."""
+        self.last_drift = position - self.position()
+        self.sync(position)
+        return self.last_drift
+
+    def update(
+        self,
+        *,
+        playing: bool | None = None,
+        rate: float | None = None,
+        length: int | None = None,
+    ) -> None:
+        """Change playback parameters, keeping the position reached so far."""
+        self._anchor_position = self.position()
+        self._anchor_time = self._now()
+        if playing is not None:
+            self.playing = playing
+        if rate is not None:
+            self.rate = rate
+        if length is not None:
+            self.length = length
+
+    def stats(self) -> dict[str, int | float | bool]:
+        return {
+            "position": self.position(),
+            "playing": self.playing,
+            "rate": self.rate,
+            "resyncs": self.resyncs,
+            "last_drift_us": self.last_drift,
+        }
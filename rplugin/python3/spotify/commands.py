@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from collections import deque
+from collections.abc import Awaitable
+from collections.abc import Callable
+from enum import StrEnum
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import Protocol
+from typing import final
+
+from .mpris import PlaybackStatus
+
+if TYPE_CHECKING:
+    from .runner import Spawn
+    from .snapshot import PlayerSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerCommand(StrEnum):
+    TOGGLE = "toggle"
+    SHUFFLE = "shuffle"
+    NEXT = "next"
+    PREVIOUS = "prev"
+    SEEK = "seek"
+    VOLUME = "volume"
+
+
+# Commands that merge with one another; next and previous share a net skip
+_KINDS = {
+    PlayerCommand.TOGGLE: "toggle",
+    PlayerCommand.SHUFFLE: "shuffle",
+    PlayerCommand.NEXT: "skip",
+    PlayerCommand.PREVIOUS: "skip",
+    PlayerCommand.SEEK: "seek",
+    PlayerCommand.VOLUME: "volume",
+}
+
+# Kinds a held key repeats; they are sent at most once per adjust interval
+ADJUSTMENTS = frozenset({"seek", "volume"})
+
+
+class PlayerControls(Protocol):
+    """What the queue needs from Spotify or BrokerClient."""
+
+    @property
+    def service(self) -> object: ...
+    async def toggle_playback(self) -> None: ...
+    async def toggle_shuffle(self) -> None: ...
+    async def next_track(self) -> None: ...
+    async def previous_track(self) -> None: ...
+    async def seek(self, offset: int) -> None: ...
+    async def set_position(
+        self, position: int, track_id: str | None = None
+    ) -> None: ...
+    async def set_volume(self, volume: float) -> None: ...
+
+
+def parse_adjustment(arg: str) -> tuple[float, bool]:
+    """
+    Parse a seek or volume argument into (value, relative). A leading sign
+    makes it relative ("+10", "-5"); "m:ss" and "h:mm:ss" read as seconds.
+
+    Raises:
+        ValueError: The argument is not a finite number or a time.
+    """
+    arg = arg.strip()
+    relative = arg[:1] in ("+", "-")
+    sign = -1.0 if arg[:1] == "-" else 1.0
+    value = 0.0
+    for part in arg.lstrip("+-").split(":"):
+        value = value * 60 + float(part)
+    # float() also reads "nan", "inf" and overflowing exponents like "1e999"
+    if not math.isfinite(value):
+        raise ValueError(f"Not a finite number: {arg!r}")
+    return sign * value, relative
+
+
+def _clamp_volume(volume: float) -> float:
+    return min(1.0, max(0.0, round(volume, 4)))
+
+
+def predicted_changes(
+    command: PlayerCommand,
+    state: PlayerSnapshot,
+    value: float = 0,
+    relative: bool = True,
+) -> dict[str, Any]:
+    """
+    The Player properties a press is expected to change, as a PropertiesChanged
+    payload applied on top of `state`. Empty when the outcome is unknown, as
+    for next/previous, or not a property, as for seeking.
+    """
+    if command == PlayerCommand.TOGGLE:
+        playing = state.playback_status == PlaybackStatus.PLAYING
+        return {
+            "PlaybackStatus": PlaybackStatus.PAUSED
+            if playing
+            else PlaybackStatus.PLAYING
+        }
+    if command == PlayerCommand.SHUFFLE:
+        return {"Shuffle": not state.shuffle}
+    if command == PlayerCommand.VOLUME:
+        return {"Volume": _clamp_volume(state.volume + value if relative else value)}
+    return {}
+
+
+@final
+class QueuedCommand:
+    """
+    Consecutive presses of one kind for one player, folded into a net amount:
+    playback and shuffle toggles modulo 2, skips as a signed track offset (next +1, previous -1),
+    seeks in microseconds and volume as a fraction of full volume. Relative
+    seeks and volume changes add up; an absolute one replaces what came before
+    and later relative presses adjust it.
+    """
+
+    def __init__(
+        self,
+        command: PlayerCommand,
+        player: str,
+        value: float = 0,
+        relative: bool = True,
+    ):
+        self.kind = _KINDS[command]
+        self.player = player
+        self.amount: float = 0
+        self.relative = True
+        self.presses = 0
+        self.add(command, value, relative)
+
+    def add(self, command: PlayerCommand, value: float = 0, relative: bool = True):
+        self.presses += 1
+        if command in (PlayerCommand.TOGGLE, PlayerCommand.SHUFFLE):
+            self.amount = (self.amount + 1) % 2
+        elif command == PlayerCommand.NEXT:
+            self.amount += 1
+        elif command == PlayerCommand.PREVIOUS:
+            self.amount -= 1
+        elif relative:
+            self.amount += value
+        else:
+            self.amount = value
+            self.relative = False
+
+    def accepts(self, command: PlayerCommand, player: str) -> bool:
+        return _KINDS[command] == self.kind and player == self.player
+
+    @property
+    def empty(self) -> bool:
+        """Whether the merged presses cancelled out."""
+        return self.relative and self.amount == 0
+
+    async def run(self, client: PlayerControls, state: PlayerSnapshot | None) -> int:
+        """Issue the net calls; returns how many were made."""
+        if self.kind in ("toggle", "shuffle"):
+            if self.amount:
+                toggle = client.toggle_playback
+                if self.kind == "shuffle":
+                    toggle = client.toggle_shuffle
+                await toggle()
+            return int(self.amount)
+        if self.kind == "skip":
+            step = client.next_track if self.amount > 0 else client.previous_track
+            for _ in range(abs(int(self.amount))):
+                await step()
+            return abs(int(self.amount))
+        if self.kind == "seek":
+            if self.relative:
+                await client.seek(int(self.amount))
+            else:
+                # The stored track id spares set_position a metadata read
+                track_id = state.metadata.track_id if state is not None else None
+                await client.set_position(max(0, int(self.amount)), track_id or None)
+            return 1
+        volume = self.amount
+        if self.relative:
+            if state is None:
+                raise RuntimeError("Current volume unknown; nothing is playing")
+            volume += state.volume
+        await client.set_volume(_clamp_volume(volume))
+        return 1
+
+    def __repr__(self) -> str:
+        amount = f"{self.amount:+g}" if self.relative else f"={self.amount:g}"
+        return (
+            f"QueuedCommand({self.kind}, amount={amount}, "
+            f"presses={self.presses}, player={self.player!r})"
+        )
+
+
+@final
+class CommandQueue:
+    """
+    Ordered player commands, run one at a time on the loop.
+
+    Presses that arrive while earlier commands are still running wait in the
+    queue, where they merge with the last queued entry when it is of the same
+    kind and for the same player: toggles cancel out in pairs, next/previous
+    presses add up to a net skip and seek/volume presses to a net adjustment.
+    Entries that net out to nothing are dropped. Adjustments are sent at most
+    once per `adjust_interval`; presses arriving in between fold into the
+    waiting entry, so a held key sends one call per interval with everything
+    pressed so far instead of queueing one call per repeat.
+
+    Each entry runs against the player that was active when it was pressed and
+    is dropped if another player has become active since. Once the queue
+    drains, `on_drained` is called once. Must be used from the thread running
+    `loop`.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        spawn: Spawn,
+        connect: Callable[[], Awaitable[PlayerControls]],
+        state: Callable[[], PlayerSnapshot | None],
+        on_drained: Callable[[], None],
+        on_error: Callable[[QueuedCommand, Exception], None],
+        timeout: float = 3.0,
+        adjust_interval: float = 0.1,
+    ):
+        """
+        Args:
+            loop: The event loop commands run on.
+            spawn: Runs the worker that drains the queue, e.g. in an
+                   AsyncRunner group.
+            connect: Returns the connected client to send commands through.
+            state: Returns the current player state, the base of relative
+                   volume changes and the track id for absolute seeks.
+            on_drained: Called once the queue empties after running a command.
+            on_error: Called with the failed entry and the error.
+            timeout: Seconds each entry may take, connecting included.
+            adjust_interval: Minimum seconds between seek or volume calls.
+        """
+        self._loop = loop
+        self._spawn = spawn
+        self._connect = connect
+        self._state = state
+        self._on_drained = on_drained
+        self._on_error = on_error
+        self.timeout = timeout
+        self.adjust_interval = adjust_interval
+        self._pending: deque[QueuedCommand] = deque()
+        self._worker: asyncio.Task[None] | None = None
+        self._last_adjust = float("-inf")
+
+        self.pushed = 0
+        self.merged = 0
+        self.cancelled = 0
+        self.stale = 0
+        self.calls = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    @property
+    def busy(self) -> bool:
+        """Whether commands are queued or running."""
+        return self._worker is not None
+
+    def push(
+        self,
+        command: PlayerCommand,
+        player: str,
+        value: float = 0,
+        relative: bool = True,
+    ) -> None:
+        """
+        Queue a press for `player`, merging it with the last queued entry.
+
+        Args:
+            command: What was pressed.
+            player: Bus name of the player active at the time of the press.
+            value: Seek offset or position in microseconds, or volume as a
+                   fraction of full volume; unused by the other commands.
+            relative: Whether `value` is an offset or an absolute target.
+        """
+        self.pushed += 1
+        last = self._pending[-1] if self._pending else None
+        if last is not None and last.accepts(command, player):
+            last.add(command, value, relative)
+            self.merged += 1
+            if last.empty:
+                self._pending.pop()
+                self.cancelled += 1
+        else:
+            self._pending.append(QueuedCommand(command, player, value, relative))
+        self.max_depth = max(self.max_depth, len(self._pending))
+        if self._worker is None:
+            self._worker = self._spawn(self._drain())
+
+    def cancel(self) -> None:
+        self._pending.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    async def _drain(self) -> None:
+        ran = False
+        try:
+            while self._pending:
+                if self._pending[0].kind in ADJUSTMENTS:
+                    wait = self._last_adjust + self.adjust_interval - self._loop.time()
+                    if wait > 0:
+                        # Presses in the meantime fold into the waiting entry
+                        await asyncio.sleep(wait)
+                        continue
+                    self._last_adjust = self._loop.time()
+                entry = self._pending.popleft()
+                try:
+                    async with asyncio.timeout(self.timeout):
+                        client = await self._connect()
+                        if str(client.service) != entry.player:
+                            logger.info(
+                                f"Dropping {entry}: {client.service} is active."
+                            )
+                            self.stale += 1
+                            continue
+                        logger.debug("Running %s", entry)
+                        self.calls += await entry.run(client, self._state())
+                        ran = True
+                except Exception as e:
+                    self._on_error(entry, e)
+        finally:
+            self._worker = None
+        if ran:
+            self._on_drained()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "depth": len(self._pending),
+            "max_depth": self.max_depth,
+            "pushed": self.pushed,
+            "merged": self.merged,
+            "cancelled": self.cancelled,
+            "stale": self.stale,
+            "calls": self.calls,
+        }
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from typing import Any
+
+if TYPE_CHECKING:
+    from .snapshot import PlayerSnapshot
+
+# Every field of the display state mirrored into `require("lib.spotify").state`,
+# with the value shown while there is no player state. Values are never None:
+# a nil would delete the key from the Lua table instead of updating it.
+EMPTY_DISPLAY: dict[str, Any] = {
+    # Pre-rendered components
+    "text": "",
+    "icon": "",
+    "progress": "",
+    # Player state; `position` and `length` are in whole seconds
+    "status": "",
+    "artist": "",
+    "title": "",
+    "album": "",
+    "shuffle": False,
+    "loop": "",
+    "volume": 0.0,
+    "position": 0,
+    "length": 0,
+    "can_control": False,
+    "can_go_next": False,
+    "can_go_previous": False,
+    "can_play": False,
+    "can_pause": False,
+    "can_seek": False,
+}
+
+
+def player_fields(state: PlayerSnapshot | None) -> dict[str, Any]:
+    """
+    The player-state fields of the display state. `position` is left to the
+    progress renderer, which advances it once per displayed second.
+    """
+    if state is None:
+        return {
+            name: value
+            for name, value in EMPTY_DISPLAY.items()
+            if name not in ("text", "icon", "progress", "position")
+        }
+    metadata = state.metadata
+    return {
+        "status": str(state.playback_status),
+        "artist": ", ".join(metadata.artist),
+        "title": metadata.title,
+        "album": metadata.album,
+        "shuffle": state.shuffle,
+        "loop": str(state.loop_status),
+        "volume": state.volume,
+        "length": metadata.length // 1_000_000,
+        "can_control": state.can_control,
+        "can_go_next": state.can_go_next,
+        "can_go_previous": state.can_go_previous,
+        "can_play": state.can_play,
+        "can_pause": state.can_pause,
+        "can_seek": state.can_seek,
+    }
+
+
+def diff_display(current: dict[str, Any], pushed: dict[str, Any]) -> dict[str, Any]:
+    """The fields of `current` whose value differs from what was last pushed."""
+    return {
+        name: value
+        for name, value in current.items()
+        if name not in pushed or pushed[name] != value
+    }
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 from enum import StrEnum
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import Protocol
 from typing import cast
@@ -8,12 +11,50 @@ from typing import final
 from typing import override
 
 from dbus_fast import BusType
+from dbus_fast import ErrorType
+from dbus_fast import Message
+from dbus_fast import MessageType
 from dbus_fast.aio import MessageBus
+from dbus_fast.aio.proxy_object import ProxyObject
+from dbus_fast.errors import DBusError
+from dbus_fast.introspection import Node
+from dbus_fast.signature import Variant
 
-from .models import LoopStatus
-from .models import PlaybackStatus
+from .introspection import IntrospectionCache
+from .metrics import CallMetrics
 from .models import PlayerState
 from .models import TrackMetadata
+from .mpris import PLAYER_PROPERTIES
+from .mpris import LoopStatus
+from .snapshot import PlayerSnapshot
+from .subscriptions import NameOwnerChangedHandler
+from .subscriptions import PropertiesChangedHandler
+from .subscriptions import SeekedHandler
+from .subscriptions import SignalSubscriptions
+from .tracing import tracer
+
+if TYPE_CHECKING:
+    from .registry import PlayerRegistry
+
+logger = logging.getLogger(__name__)
+
+# Errors suggesting a cached introspection no longer matches the player. Not
+# InvalidArgs: players also send it for a bad value, e.g. a stale track id.
+STALE_INTROSPECTION_ERRORS = frozenset(
+    {
+        ErrorType.CLIENT_ERROR.value,
+        ErrorType.INVALID_SIGNATURE.value,
+        ErrorType.UNKNOWN_METHOD.value,
+        ErrorType.UNKNOWN_PROPERTY.value,
+    }
+)
+
+
+class PlayerNotRunning(DBusError):
+    """Raised without any bus traffic while the player's bus name has no owner."""
+
+    def __init__(self, service: str):
+        super().__init__(ErrorType.SERVICE_UNKNOWN, f"{service} is not running")
 
 
 class AsyncPlayerInterface(Protocol):
@@ -59,6 +100,16 @@ class AsyncMediaPlayer2Interface(Protocol):
     async def get_supported_mime_types(self) -> list[str]: ...
 
 
+class AsyncPropertiesInterface(Protocol):
+    async def call_get(self, interface_name: str, property_name: str) -> Variant: ...
+    async def call_get_all(self, interface_name: str) -> dict[str, Variant]: ...
+    async def call_set(
+        self, interface_name: str, property_name: str, value: Variant
+    ) -> None: ...
+    def on_properties_changed(self, callback: PropertiesChangedHandler) -> None: ...
+    def off_properties_changed(self, callback: PropertiesChangedHandler) -> None: ...
+
+
 class SpotifyService(StrEnum):
     DAEMON = "spotifyd"
     DESKTOP = "spotify"
@@ -74,12 +125,43 @@ class Spotify:
     PATH = "/org/mpris/MediaPlayer2"
     PLAYER = "org.mpris.MediaPlayer2.Player"
     MEDIA_PLAYER = "org.mpris.MediaPlayer2"
-
-    def __init__(self, service: SpotifyService = SpotifyService.DESKTOP):
+    PROPERTIES = "org.freedesktop.DBus.Properties"
+    # Properties a GetAll reply must carry before it is trusted over the fallback
+    REQUIRED_PROPERTIES = frozenset({"PlaybackStatus", "Metadata"})
+
+    def __init__(
+        self,
+        service: SpotifyService | str = SpotifyService.DESKTOP,
+        introspection_cache: IntrospectionCache | None = None,
+        registry: PlayerRegistry | None = None,
+    ):
+        """
+        Args:
+            service: Bus name of the player to control.
+            introspection_cache: Where to keep introspection data between runs.
+            registry: Follow whichever player the registry makes active instead
+                      of `service`, which then only names the initial target.
+        """
         self._service = service
+        self._introspection_cache = introspection_cache
+        self._identity: str | None = None
         self._bus: MessageBus | None = None
+        self._proxy: ProxyObject | None = None
         self._player: AsyncPlayerInterface | None = None
         self._media_player: AsyncMediaPlayer2Interface | None = None
+        self._properties: AsyncPropertiesInterface | None = None
+        self._get_all_supported = True
+        self._connect_lock = asyncio.Lock()
+        # Unique bus name of the running player, "" while none is running
+        self._owner: str | None = None
+        self._registry = registry
+        self._subscriptions: SignalSubscriptions | PlayerRegistry = (
+            registry or SignalSubscriptions(str(service), self.PATH, self.PLAYER)
+        )
+        # Registered first so every other handler already sees the new owner
+        self._subscriptions.add_name_owner_changed_handler(self._on_name_owner_changed)
+        # Latency of every proxy call, connect and introspection, by name
+        self.metrics = CallMetrics()
 
     async def __aenter__(self) -> Spotify:
         await self.connect()
@@ -89,9 +171,76 @@ class Spotify:
         await self.disconnect()
 
     async def connect(self) -> None:
-        self._bus = await MessageBus(bus_type=BusType.SESSION).connect()
+        await self._connect_bus()
+
+        try:
+            self._require_owner()
+            await self._attach()
+        except BaseException:
+            await self.disconnect()
+            raise
+
+    async def _connect_bus(self) -> None:
+        """Open the bus, subscribe to the player's signals and look up its owner."""
+        with self.metrics.timed("connect"):
+            await self._open_bus()
 
-        introspection = await self._bus.introspect(str(self._service), self.PATH)
+    async def _open_bus(self) -> None:
+        self._bus = await MessageBus(bus_type=BusType.SESSION).connect()
+        # Skip dbus_fast's name-owner cache: it subscribes to NameOwnerChanged for
+        # every name on the bus, and only its proxy signal routing needs it.
+        # SignalSubscriptions tracks the player's name with a narrow rule instead.
+        # The flag is private; pyproject.toml caps dbus-fast to versions having it.
+        self._bus._high_level_client_initialized = True  # pyright: ignore[reportPrivateUsage]
+
+        try:
+            await self._subscriptions.install(self._bus)
+            if self._registry is None:
+                self._owner = await self._get_name_owner()
+            elif (active := self._registry.active) is not None:
+                self._service, self._owner = active.name, active.owner
+            else:
+                self._owner = ""
+        except BaseException:
+            await self.disconnect()
+            raise
+
+    async def _get_name_owner(self) -> str:
+        assert self._bus is not None
+        reply = await self._bus.call(
+            Message(
+                destination="org.freedesktop.DBus",
+                path="/org/freedesktop/DBus",
+                interface="org.freedesktop.DBus",
+                member="GetNameOwner",
+                signature="s",
+                body=[str(self._service)],
+            )
+        )
+        assert reply is not None
+        if reply.message_type == MessageType.ERROR:
+            if reply.error_name == ErrorType.NAME_HAS_NO_OWNER.value:
+                return ""
+            raise DBusError(reply.error_name or ErrorType.FAILED, *reply.body[:1])
+        return str(reply.body[0])
+
+    def _require_owner(self) -> None:
+        if not self._owner:
+            raise PlayerNotRunning(str(self._service))
+
+    def _on_name_owner_changed(self, name: str, old_owner: str, new_owner: str) -> None:
+        # Any proxy was built for the previous owner, if there was one. With a
+        # registry, `name` is the newly active player.
+        if new_owner:
+            self._service = name
+        self._owner = new_owner
+        self._detach()
+
+    async def _attach(self) -> None:
+        """Build the proxy and interfaces on the current bus."""
+        assert self._bus is not None
+        with self.metrics.timed("introspect"):
+            introspection = await self._introspect()
 
         proxy_object = self._bus.get_proxy_object(
             str(self._service), self.PATH, introspection
@@ -100,17 +249,159 @@ class Spotify:
         media_player_interface = proxy_object.get_interface(self.MEDIA_PLAYER)
         player_interface = proxy_object.get_interface(self.PLAYER)
 
+        self._proxy = proxy_object
         self._media_player = cast(
             AsyncMediaPlayer2Interface, cast(object, media_player_interface)
         )
         self._player = cast(AsyncPlayerInterface, cast(object, player_interface))
+        self._properties = cast(
+            AsyncPropertiesInterface,
+            cast(object, proxy_object.get_interface(self.PROPERTIES)),
+        )
+        self._get_all_supported = True
+
+    def _detach(self) -> None:
+        """Drop the proxy, keeping the bus and its signal subscriptions."""
+        self._proxy = None
+        self._media_player = None
+        self._player = None
+        self._properties = None
+
+    async def _introspect(self) -> Node:
+        """Introspect the service, going through the cache when one is configured."""
+        assert self._bus is not None
+        service = str(self._service)
+        if self._introspection_cache is None:
+            return await self._bus.introspect(service, self.PATH)
+
+        self._identity = await self._get_identity()
+        node = self._introspection_cache.get(service, self._identity)
+        if node is None:
+            node = await self._bus.introspect(service, self.PATH)
+            self._introspection_cache.put(service, self._identity, node)
+        return node
+
+    async def _get_identity(self) -> str:
+        """Read MediaPlayer2.Identity with a raw Get, which needs no proxy."""
+        assert self._bus is not None
+        reply = await self._bus.call(
+            Message(
+                destination=str(self._service),
+                path=self.PATH,
+                interface=self.PROPERTIES,
+                member="Get",
+                signature="ss",
+                body=[self.MEDIA_PLAYER, "Identity"],
+            )
+        )
+        assert reply is not None
+        if reply.message_type == MessageType.ERROR:
+            raise DBusError(reply.error_name or ErrorType.FAILED, *reply.body[:1])
+        return str(reply.body[0].value)
+
+    async def _call(
+        self, interface: Any, member: str, *args: Any, introspected: bool = True
+    ) -> Any:
+        """
+        Invoke a proxy method by name, timing it under that name and dropping
+        the cached introspection and the proxy built from it when the player
+        rejects the call's signature.
+
+        Args:
+            introspected: False for members whose signature is fixed by the
+                D-Bus spec rather than read from the player, like GetAll;
+                their errors never mark the introspection stale.
+        """
+        method = getattr(interface, member)
+        try:
+            with self.metrics.timed(member), tracer.span(member, "dbus"):
+                return await method(*args)
+        except DBusError as e:
+            if introspected and e.type in STALE_INTROSPECTION_ERRORS:
+                logger.warning("Introspection for %s looks stale: %s", self._service, e)
+                if self._introspection_cache is not None and self._identity:
+                    self._introspection_cache.invalidate(
+                        str(self._service), self._identity
+                    )
+                self._detach()
+            raise
 
     async def disconnect(self) -> None:
         if self._bus:
-            self._bus.disconnect()
+            if self._bus.connected:
+                self._bus.disconnect()
             self._bus = None
+            self._owner = None
+            self._subscriptions.reset()
+            self._proxy = None
             self._media_player = None
             self._player = None
+            self._properties = None
+
+    @property
+    def connected(self) -> bool:
+        return self._bus is not None and self._bus.connected and self._proxy is not None
+
+    @property
+    def service(self) -> SpotifyService | str:
+        return self._service
+
+    @property
+    def player_running(self) -> bool | None:
+        """Whether the player owns its bus name, or None without a bus to ask."""
+        if self._bus is None or not self._bus.connected:
+            return None
+        return bool(self._owner)
+
+    async def ensure_connected(self) -> Spotify:
+        """
+        Return this instance with a live connection, reusing the existing bus
+        and proxy and only reconnecting once the bus has actually dropped.
+
+        Raises:
+            PlayerNotRunning: Without any bus call once the bus is up, while
+                the player's bus name has no owner.
+        """
+        if self.connected:
+            return self
+        async with self._connect_lock:
+            if self.connected:
+                return self
+            if self._bus is None or not self._bus.connected:
+                await self.disconnect()
+                await self._connect_bus()
+            self._require_owner()
+            await self._attach()
+        return self
+
+    async def wait_for_disconnect(self) -> None:
+        """Return once the current bus connection has dropped, for whatever reason."""
+        if self._bus is None:
+            return
+        try:
+            await self._bus.wait_for_disconnect()
+        except Exception as e:
+            logger.warning("Bus connection to %s lost: %s", self._service, e)
+
+    def add_properties_changed_handler(self, handler: PropertiesChangedHandler) -> None:
+        """Register a Player PropertiesChanged handler that survives reconnects."""
+        self._subscriptions.add_properties_changed_handler(handler)
+
+    def add_seeked_handler(self, handler: SeekedHandler) -> None:
+        """Register a Player.Seeked handler that survives reconnects."""
+        self._subscriptions.add_seeked_handler(handler)
+
+    def add_name_owner_changed_handler(self, handler: NameOwnerChangedHandler) -> None:
+        """Register a handler for the player's bus name appearing or vanishing."""
+        self._subscriptions.add_name_owner_changed_handler(handler)
+
+    def call_stats(self) -> dict[str, dict[str, int | float]]:
+        """Counts, failures and latency percentiles per call made on the bus."""
+        return self.metrics.stats()
+
+    def signal_stats(self) -> dict[str, int]:
+        """Signals delivered by the bus versus signals dispatched to handlers."""
+        return self._subscriptions.stats()
 
     @property
     def media_player(self) -> AsyncMediaPlayer2Interface:
@@ -124,54 +415,120 @@ class Spotify:
             raise RuntimeError("Not connected to D-Bus")
         return self._player
 
+    @property
+    def properties(self) -> AsyncPropertiesInterface:
+        if not self._properties:
+            raise RuntimeError("Not connected to D-Bus")
+        return self._properties
+
     async def get_metadata(self) -> TrackMetadata:
-        metadata = await self.player.get_metadata()
+        metadata = await self._call(self.player, "get_metadata")
         return TrackMetadata.from_dbus_dict(metadata)
 
+    async def get_position(self) -> int:
+        return await self._call(self.player, "get_position")
+
     async def getplayer_state(self) -> PlayerState:
-        return PlayerState(
-            playback_status=PlaybackStatus(await self.player.get_playback_status()),
-            loop_status=LoopStatus(await self.player.get_loop_status()),
-            shuffle=await self.player.get_shuffle(),
-            volume=await self.player.get_volume(),
-            position=await self.player.get_position(),
-            metadata=await self.get_metadata(),
-            can_control=await self.player.get_can_control(),
-            can_go_next=await self.player.get_can_go_next(),
-            can_go_previous=await self.player.get_can_go_previous(),
-            can_play=await self.player.get_can_play(),
-            can_pause=await self.player.get_can_pause(),
-            can_seek=await self.player.get_can_seek(),
+        """
+        Fetch the full player state with a single Properties.GetAll round trip,
+        falling back to concurrent per-property calls for players that reject
+        GetAll or return an incomplete reply.
+        """
+        properties = await self._get_player_properties()
+        with tracer.span("PlayerState.from_dbus_dict", "model"):
+            return PlayerState.from_dbus_dict(properties)
+
+    async def getplayer_state_concurrent(self) -> PlayerState:
+        """Fetch the player state by issuing every property getter concurrently."""
+        return PlayerState.from_dbus_dict(
+            await self._get_player_properties_concurrent()
+        )
+
+    async def get_snapshot(self) -> PlayerSnapshot:
+        """Like getplayer_state, but skip validation and build a PlayerSnapshot."""
+        properties = await self._get_player_properties()
+        with tracer.span("PlayerSnapshot.from_dbus_dict", "model"):
+            return PlayerSnapshot.from_dbus_dict(properties)
+
+    async def get_properties(self) -> dict[str, Any]:
+        """
+        The raw Player properties keyed by MPRIS name, values as the bus returned
+        them (Variants from GetAll, plain values from the per-property fallback).
+        """
+        return await self._get_player_properties()
+
+    async def _get_player_properties(self) -> dict[str, Any]:
+        if self._get_all_supported:
+            try:
+                properties = await self._call(
+                    self.properties, "call_get_all", self.PLAYER, introspected=False
+                )
+            except DBusError as e:
+                logger.warning(
+                    "GetAll failed on %s (%s); using per-property fallback.",
+                    self._service,
+                    e,
+                )
+                self._get_all_supported = False
+            else:
+                if self.REQUIRED_PROPERTIES.issubset(properties):
+                    return properties
+                logger.warning(
+                    "GetAll reply from %s is missing %s; using per-property fallback.",
+                    self._service,
+                    sorted(self.REQUIRED_PROPERTIES.difference(properties)),
+                )
+                self._get_all_supported = False
+
+        return await self._get_player_properties_concurrent()
+
+    async def _get_player_properties_concurrent(self) -> dict[str, Any]:
+        # Getter names mirror the field names, e.g. CanGoNext -> get_can_go_next
+        values = await asyncio.gather(
+            *(
+                self._call(self.player, f"get_{name}")
+                for name in PLAYER_PROPERTIES.values()
+            )
         )
+        return dict(zip(PLAYER_PROPERTIES, values, strict=True))
 
     async def play(self) -> None:
-        await self.player.call_play()
+        await self._call(self.player, "call_play")
 
     async def pause(self) -> None:
-        await self.player.call_pause()
+        await self._call(self.player, "call_pause")
 
     async def next_track(self) -> None:
-        await self.player.call_next()
+        await self._call(self.player, "call_next")
 
     async def previous_track(self) -> None:
-        await self.player.call_previous()
+        await self._call(self.player, "call_previous")
+
+    async def seek(self, offset: int) -> None:
+        """Seek relative to the current position, in microseconds."""
+        await self._call(self.player, "call_seek", offset)
 
-    async def set_position(self, position: int) -> None:
-        metadata = await self.get_metadata()
-        await self.player.call_set_position(metadata.track_id, position)
+    async def set_position(self, position: int, track_id: str | None = None) -> None:
+        """
+        Seek to an absolute position. Pass the current track id when it is
+        already known; otherwise it is read from the (memoized) metadata.
+        """
+        if track_id is None:
+            track_id = (await self.get_metadata()).track_id
+        await self._call(self.player, "call_set_position", track_id, position)
 
     async def set_volume(self, volume: float) -> None:
-        await self.player.set_volume(volume)
+        await self._call(self.player, "set_volume", volume)
 
     async def set_loop_status(self, status: LoopStatus) -> None:
-        await self.player.set_loop_status(status)
+        await self._call(self.player, "set_loop_status", status)
 
     async def toggle_playback(self) -> None:
-        await self.player.call_play_pause()
+        await self._call(self.player, "call_play_pause")
 
     async def toggle_shuffle(self) -> None:
-        current = await self.player.get_shuffle()
-        await self.player.set_shuffle(not current)
+        current = await self._call(self.player, "get_shuffle")
+        await self._call(self.player, "set_shuffle", not current)
 
     async def stop(self) -> None:
-        await self.player.call_stop()
+        await self._call(self.player, "call_stop")
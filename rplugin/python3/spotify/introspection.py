@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import final
+
+from dbus_fast.introspection import Node
+
+logger = logging.getLogger(__name__)
+
+
+def default_cache_path() -> Path:
+    """Mirror Neovim's `stdpath("cache")` without an RPC round trip."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    appname = os.environ.get("NVIM_APPNAME") or "nvim"
+    return Path(cache_home) / appname / "spotify" / "introspection.json"
+
+
+@final
+class IntrospectionCache:
+    """
+    Parsed MPRIS introspection keyed by service name and player identity.
+
+    Nodes are kept in memory for the life of the process and their XML is
+    persisted to a small JSON file so later sessions can build proxies without
+    an introspect round trip.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self._path = path
+        self._nodes: dict[str, Node] = {}
+        self._xml: dict[str, str] | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(service: str, identity: str) -> str:
+        return f"{service}|{identity}"
+
+    def get(self, service: str, identity: str) -> Node | None:
+        key = self.key(service, identity)
+        node = self._nodes.get(key)
+        if node is None:
+            xml = self._load().get(key)
+            if xml is not None:
+                try:
+                    node = Node.parse(xml)
+                except Exception:
+                    logger.warning("Discarding unparsable introspection for %s", key)
+                    self.invalidate(service, identity)
+                else:
+                    self._nodes[key] = node
+        if node is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return node
+
+    def put(self, service: str, identity: str, node: Node) -> None:
+        key = self.key(service, identity)
+        self._nodes[key] = node
+        self._load()[key] = node.tostring()
+        self._save()
+
+    def invalidate(self, service: str, identity: str) -> None:
+        key = self.key(service, identity)
+        logger.info("Dropping cached introspection for %s", key)
+        self._nodes.pop(key, None)
+        if self._load().pop(key, None) is not None:
+            self._save()
+
+    def _load(self) -> dict[str, str]:
+        if self._xml is not None:
+            return self._xml
+        xml: dict[str, str] = {}
+        if self._path is not None and self._path.exists():
+            try:
+                xml = json.loads(self._path.read_text())
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable introspection cache: %s", e)
+        self._xml = xml
+        return xml
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._load()))
+            tmp.replace(self._path)
+        except OSError as e:
+            logger.warning("Could not write introspection cache: %s", e)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._nodes)}
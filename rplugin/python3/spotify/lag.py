@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import final
+
+from .metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+@final
+class LoopLagMonitor:
+    """
+    Samples how late the loop runs a timer, the time a signal handler or
+    command would have waited behind whatever was occupying the loop.
+
+    A timer is re-armed every `interval` seconds; the delay between its due
+    time and its callback running is one sample. The histogram and percentiles
+    cover a rolling window of the last `window / 2` to `window` samples:
+    samples go into a histogram that replaces the previous one once it holds
+    half the window, so old lag ages out at a constant cost per sample. Lag
+    above `warn_ms` is logged, at most once per `warn_every` seconds. Sampling
+    wakes the loop every `interval`, so it only runs between start() and
+    stop(), which must be called from the thread running `loop`; stats() may
+    be read from any thread.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        interval: float = 0.5,
+        window: int = 600,
+        warn_ms: float = 100.0,
+        warn_every: float = 30.0,
+    ):
+        """
+        Args:
+            loop: The event loop to watch.
+            interval: Seconds between samples.
+            window: Samples the histogram covers at most.
+            warn_ms: Lag in milliseconds that is logged as a warning.
+            warn_every: Minimum seconds between two warnings.
+        """
+        self._loop = loop
+        self.interval = interval
+        self.window = window
+        self.warn_ms = warn_ms
+        self.warn_every = warn_every
+        self._current = LatencyHistogram()
+        self._previous = LatencyHistogram()
+        self._timer: asyncio.TimerHandle | None = None
+        self._due = 0.0
+        self._last_warning = float("-inf")
+
+        self.lagged = 0
+        self.last_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._timer is not None
+
+    @property
+    def histogram(self) -> LatencyHistogram:
+        """The samples in the current window."""
+        return self._previous.merged(self._current)
+
+    def start(self) -> None:
+        if self._timer is None:
+            self._current = LatencyHistogram()
+            self._previous = LatencyHistogram()
+            self.lagged = 0
+            self._arm()
+
+    def stop(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _arm(self) -> None:
+        self._due = self._loop.time() + self.interval
+        self._timer = self._loop.call_at(self._due, self._sample)
+
+    def _sample(self) -> None:
+        lag_ms = max(0.0, (self._loop.time() - self._due) * 1000)
+        if self._current.calls >= self.window // 2:
+            self._previous, self._current = self._current, LatencyHistogram()
+        self._current.record(lag_ms)
+        self.last_ms = lag_ms
+        if lag_ms >= self.warn_ms:
+            self.lagged += 1
+            now = self._loop.time()
+            if now - self._last_warning >= self.warn_every:
+                self._last_warning = now
+                logger.warning(
+                    "Event loop lagged %.0fms; signals and commands are waiting "
+                    "behind blocking work (%d lagged samples so far).",
+                    lag_ms,
+                    self.lagged,
+                )
+        self._arm()
+
+    def stats(self) -> dict[str, object]:
+        histogram = self.histogram
+        stats: dict[str, object] = {
+            "loop": f"{type(self._loop).__module__}.{type(self._loop).__name__}",
+            "running": self.running,
+            "sampled": histogram.calls,
+            "window": self.window,
+            "lagged": self.lagged,
+        }
+        if histogram.calls:
+            stats["last_ms"] = round(self.last_ms, 3)
+        stats.update(histogram.latency_stats())
+        stats["histogram"] = histogram.bucket_counts()
+        return stats
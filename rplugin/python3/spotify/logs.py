@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import re
+from pathlib import Path
+from typing import final
+
+logger = logging.getLogger(__name__)
+
+_FORMAT = "%(asctime)s %(levelname)s [%(threadName)s] %(name)s: %(message)s"
+
+# `<name>.<pid>.log` and its rotated backups `<name>.<pid>.log.<n>`
+_LOG_NAME = re.compile(r"^\w+\.(\d+)\.log(?:\.\d+)?$")
+
+
+def default_log_dir() -> Path:
+    """Mirror Neovim's `stdpath("log")` without an RPC round trip."""
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.expanduser(
+        "~/.local/state"
+    )
+    appname = os.environ.get("NVIM_APPNAME") or "nvim"
+    return Path(state_home) / appname / "spotify"
+
+
+def default_log_file(name: str = "plugin") -> str:
+    """`<stdpath("log")>/spotify/<name>.<pid>.log`, one file per process."""
+    return str(default_log_dir() / f"{name}.{os.getpid()}.log")
+
+
+def _running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists, but belongs to someone else
+        return True
+    return True
+
+
+def prune_logs(directory: Path, keep: int = 5) -> int:
+    """
+    Delete the logs of exited processes from `directory`, except those of the
+    `keep` most recently written ones. Returns how many files were deleted.
+    """
+    by_pid: dict[int, list[Path]] = {}
+    try:
+        entries = list(directory.iterdir())
+    except OSError:
+        return 0
+    for entry in entries:
+        match = _LOG_NAME.match(entry.name)
+        if match is not None:
+            by_pid.setdefault(int(match[1]), []).append(entry)
+
+    def last_written(files: list[Path]) -> float:
+        try:
+            return max(file.stat().st_mtime for file in files)
+        except OSError:
+            return 0.0
+
+    exited = [
+        files
+        for pid, files in by_pid.items()
+        if pid != os.getpid() and not _running(pid)
+    ]
+    exited.sort(key=last_written, reverse=True)
+    deleted = 0
+    for files in exited[keep:]:
+        for file in files:
+            try:
+                file.unlink()
+            except OSError:
+                continue
+            deleted += 1
+    return deleted
+
+
+@final
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Hands records to the writer thread as they are, without formatting them,
+    and drops them when the queue is full instead of blocking the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue[logging.LogRecord]):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The writer runs in this process, so the record needs no pickling and
+        # its message is merged with its arguments there, off the hot path
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+@final
+class PluginLogging:
+    """
+    Logging for the `spotify` package through a bounded in-memory queue.
+
+    Records are queued by whichever thread logs them and formatted and written
+    by a background thread to a file rotated at `max_bytes`, so neither the
+    event loop nor Neovim's main thread waits on disk. A log left by an earlier
+    process with the same PID is rotated out on start, and with the default
+    path the logs of exited processes are pruned to the last `keep`. Log
+    arguments are formatted on the writer thread; pass values rather than
+    objects that are mutated right after.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        level: int | str = logging.INFO,
+        max_bytes: int = 1024 * 1024,
+        backups: int = 2,
+        capacity: int = 10_000,
+        keep: int = 5,
+        name: str = "plugin",
+    ):
+        """
+        Args:
+            path: The log file, defaults to default_log_file(name). Only one
+                  process may write to it: each one rotates it.
+            level: Records below this level are skipped before they are created.
+            max_bytes: Size at which the file is rotated.
+            backups: How many rotated files are kept next to it.
+            capacity: Records the queue holds before new ones are dropped.
+            keep: Logs of exited processes kept next to the default path;
+                  an explicit path is never pruned around.
+            name: Which process writes the default log, "plugin" or "broker".
+        """
+        self._prune = path is None
+        self.path = path or default_log_file(name)
+        self.keep = keep
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._logger = logging.getLogger(__package__)
+        self._queue: queue.Queue[logging.LogRecord] = queue.Queue(capacity)
+        self._handler = _QueueHandler(self._queue)
+        self._listener: logging.handlers.QueueListener | None = None
+        self.set_level(level)
+
+    def start(self) -> None:
+        """Attach the queue to the package logger and start the writer thread."""
+        if self._listener is not None:
+            return
+        directory = Path(self.path).parent
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning("Could not create the log directory: %s", e)
+        if self._prune:
+            prune_logs(directory, self.keep)
+        writer = logging.handlers.RotatingFileHandler(
+            self.path, maxBytes=self.max_bytes, backupCount=self.backups, delay=True
+        )
+        writer.setFormatter(logging.Formatter(_FORMAT))
+        try:
+            if os.path.getsize(self.path) > 0:
+                writer.doRollover()
+        except OSError:
+            pass
+        self._listener = logging.handlers.QueueListener(self._queue, writer)
+        self._listener.start()
+        for handler in list(self._logger.handlers):
+            if isinstance(handler, _QueueHandler):
+                self._logger.removeHandler(handler)
+        self._logger.addHandler(self._handler)
+        # Keep records out of the host's root handlers
+        self._logger.propagate = False
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        """Write out what is still queued and stop the writer thread."""
+        listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        self._logger.removeHandler(self._handler)
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+    def set_level(self, level: int | str) -> bool:
+        """Set the level by number or name ("debug", "info", ...); False if unknown."""
+        if isinstance(level, str):
+            number = logging.getLevelNamesMapping().get(level.upper())
+            if number is None:
+                logger.warning("Unknown log level '%s'; keeping %s.", level, self.level)
+                return False
+            level = number
+        self._logger.setLevel(level)
+        return True
+
+    @property
+    def level(self) -> str:
+        return logging.getLevelName(self._logger.level)
+
+    def stats(self) -> dict[str, int | str]:
+        return {
+            "path": self.path,
+            "level": self.level,
+            "queued": self._queue.qsize(),
+            "dropped": self._handler.dropped,
+        }
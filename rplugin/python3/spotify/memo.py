@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Hashable
+from typing import Any
+from typing import final
+
+from dbus_fast.signature import Variant
+
+# Cheap stand-in for the full payload: Spotify re-sends Metadata for the same
+# track id once the art URL is known, so that and every displayed field take
+# part; players that reuse one track id for every track still get a new entry.
+FINGERPRINT_KEYS = (
+    "mpris:trackid",
+    "xesam:title",
+    "xesam:artist",
+    "xesam:album",
+    "xesam:albumArtist",
+    "xesam:trackNumber",
+    "xesam:discNumber",
+    "mpris:length",
+    "mpris:artUrl",
+    "xesam:url",
+)
+
+
+@final
+class MetadataCache[T]:
+    """
+    Bounded LRU of parsed track metadata keyed by `mpris:trackid` plus a
+    content fingerprint, so refreshes of an unchanged track reuse the same
+    immutable object instead of unwrapping and validating it again.
+    """
+
+    def __init__(self, parse: Callable[[dict[str, Any]], T], maxsize: int = 64):
+        self._parse = parse
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, T] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def fingerprint(metadata: dict[str, Any]) -> Hashable:
+        values: list[Any] = [len(metadata)]
+        for key in FINGERPRINT_KEYS:
+            value = metadata.get(key)
+            if type(value) is Variant:
+                value = value.value
+            # Artist lists are unhashable
+            values.append(tuple(value) if type(value) is list else value)
+        return tuple(values)
+
+    def get(self, metadata: dict[str, Any]) -> T:
+        key = self.fingerprint(metadata)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = self._parse(metadata)
+        self._entries[key] = entry
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from bisect import bisect_left
+from collections.abc import Mapping
+from types import TracebackType
+from typing import Any
+from typing import final
+
+# Upper bounds in milliseconds of the latency buckets; the last is open-ended
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@final
+class LatencyHistogram:
+    """
+    Outcome counts and a fixed-bucket latency histogram for one kind of call.
+
+    Recording is a bucket search and a few increments, whatever the number of
+    calls; percentiles are read off the buckets, so they are accurate to the
+    bucket's upper bound.
+    """
+
+    __slots__ = ("buckets", "calls", "errors", "timeouts", "cancelled", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, elapsed_ms: float, error: BaseException | None = None) -> None:
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+        self.calls += 1
+        self.total += elapsed_ms
+        if elapsed_ms > self.max:
+            self.max = elapsed_ms
+        if error is None:
+            return
+        if isinstance(error, TimeoutError):
+            self.timeouts += 1
+        elif isinstance(error, asyncio.CancelledError):
+            # Usually a caller's asyncio.timeout() expiring around the call
+            self.cancelled += 1
+        else:
+            self.errors += 1
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile, capped at max."""
+        rank = q * self.calls
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets, strict=False):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def latency_stats(self) -> dict[str, float]:
+        """Mean, percentiles and max in milliseconds; empty until a recording."""
+        if not self.calls:
+            return {}
+        return {
+            "mean_ms": round(self.total / self.calls, 3),
+            "p50_ms": round(self.percentile(0.5), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max, 3),
+        }
+
+    def merged(self, other: LatencyHistogram) -> LatencyHistogram:
+        """A new histogram holding the recordings of both."""
+        merged = LatencyHistogram()
+        merged.buckets = [
+            a + b for a, b in zip(self.buckets, other.buckets, strict=True)
+        ]
+        merged.calls = self.calls + other.calls
+        merged.errors = self.errors + other.errors
+        merged.timeouts = self.timeouts + other.timeouts
+        merged.cancelled = self.cancelled + other.cancelled
+        merged.total = self.total + other.total
+        merged.max = max(self.max, other.max)
+        return merged
+
+    def bucket_counts(self) -> dict[str, int]:
+        """Recordings per bucket, labelled by the bucket's upper bound."""
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS]
+        labels.append(f">{LATENCY_BUCKETS_MS[-1]}ms")
+        return dict(zip(labels, self.buckets, strict=True))
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            **self.latency_stats(),
+        }
+
+
+@final
+class _Timer:
+    __slots__ = ("_histogram", "_started")
+
+    def __init__(self, histogram: LatencyHistogram):
+        self._histogram = histogram
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self._histogram.record((time.perf_counter() - self._started) * 1000, exc)
+
+
+@final
+class CallMetrics:
+    """
+    Latency histograms keyed by call name, e.g. a D-Bus member.
+
+        with metrics.timed("call_next"):
+            await player.call_next()
+
+    The timer records on the way out, so an exception, a timeout or a
+    cancellation is counted against the call and re-raised unchanged.
+    """
+
+    def __init__(self):
+        self._histograms: dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            histogram = self._histograms[name] = LatencyHistogram()
+        return histogram
+
+    def timed(self, name: str) -> _Timer:
+        return _Timer(self.histogram(name))
+
+    def stats(self) -> dict[str, dict[str, int | float]]:
+        histograms = list(self._histograms.items())
+        return {name: histogram.stats() for name, histogram in sorted(histograms)}
+
+
+def format_stats(stats: Mapping[str, Any], indent: str = "") -> list[str]:
+    """
+    Render nested stats as text lines: a mapping of plain values becomes one
+    `name: key=value ...` line, deeper mappings an indented block.
+    """
+    lines: list[str] = []
+    for name, value in stats.items():
+        if not isinstance(value, Mapping):
+            lines.append(f"{indent}{name}: {value}")
+        elif any(isinstance(inner, Mapping) for inner in value.values()):
+            lines.append(f"{indent}{name}:")
+            lines.extend(format_stats(value, indent + "  "))
+        else:
+            fields = " ".join(f"{key}={inner}" for key, inner in value.items())
+            lines.append(f"{indent}{name}: {fields}".rstrip())
+    return lines
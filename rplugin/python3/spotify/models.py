@@ -1,34 +1,43 @@
 from __future__ import annotations
 
-from enum import StrEnum
+from typing import TYPE_CHECKING
 from typing import Any
+from typing import ClassVar
 
 from dbus_fast.signature import Variant
 from pydantic import BaseModel
 from pydantic import ConfigDict
 from pydantic import Field
 from pydantic import HttpUrl
+from pydantic import PrivateAttr
 from pydantic import SerializationInfo
 from pydantic import ValidationInfo
 from pydantic import field_serializer
 from pydantic import field_validator
 from pydantic import model_validator
 
+from .memo import MetadataCache
+from .mpris import PLAYER_PROPERTIES
+from .mpris import LoopStatus
+from .mpris import PlaybackStatus
+from .progress import format_time
 
-class PlaybackStatus(StrEnum):
-    PLAYING = "Playing"
-    PAUSED = "Paused"
-    STOPPED = "Stopped"
+if TYPE_CHECKING:
+    from .clock import PlaybackClock
 
-
-class LoopStatus(StrEnum):
-    NONE = "None"
-    PLAYLIST = "Playlist"
-    TRACK = "Track"
+__all__ = [
+    "PLAYER_PROPERTIES",
+    "LoopStatus",
+    "PlaybackStatus",
+    "PlayerState",
+    "TrackMetadata",
+]
 
 
 class TrackMetadata(BaseModel):
     model_config = ConfigDict(
+        # Frozen so parsed instances can be shared through `cache`
+        frozen=True,
         extra="ignore",
         json_schema_extra={
             "examples": [
@@ -67,8 +76,16 @@ class TrackMetadata(BaseModel):
         default=None, description="Position of the track on the disc", ge=1
     )
 
+    # Assigned below the class; shared by every parse of a metadata payload
+    cache: ClassVar[MetadataCache[TrackMetadata]]
+
     @classmethod
     def from_dbus_dict(cls, metadata: dict[str, Any]) -> TrackMetadata:
+        """Parse a Metadata payload, reusing the model of an unchanged track."""
+        return cls.cache.get(metadata)
+
+    @classmethod
+    def _parse_dbus_dict(cls, metadata: dict[str, Any]) -> TrackMetadata:
         processed_data: dict[str, Any] = {}
         for key, value in metadata.items():
             if isinstance(value, Variant):
@@ -100,14 +117,7 @@ class TrackMetadata(BaseModel):
     @field_serializer("length")
     def format_length(self, value: int, _info: SerializationInfo) -> str:
         if _info.context and _info.context.get("format_time", False):
-            seconds = value // 1_000_000
-            minutes, seconds = divmod(seconds, 60)
-            hours, minutes = divmod(minutes, 60)
-
-            if hours > 0:
-                return f"{hours}:{minutes:02d}:{seconds:02d}"
-            else:
-                return f"{minutes}:{seconds:02d}"
+            return format_time(value)
         return f"{value}"
 
     @property
@@ -120,6 +130,9 @@ class TrackMetadata(BaseModel):
         return f"{self.title} by {artists}"
 
 
+TrackMetadata.cache = MetadataCache(TrackMetadata._parse_dbus_dict)  # pyright: ignore[reportPrivateUsage]
+
+
 class PlayerState(BaseModel):
     model_config = ConfigDict(
         validate_assignment=True,
@@ -135,6 +148,7 @@ class PlayerState(BaseModel):
     loop_status: LoopStatus = Field(
         default=LoopStatus.NONE, description="Current loop/repeat status"
     )
+    rate: float = Field(default=1.0, description="Playback speed multiplier")
     shuffle: bool = Field(
         default=False, description="Whether tracks play in random order"
     )
@@ -167,6 +181,33 @@ class PlayerState(BaseModel):
         default=True, description="Whether the player can seek to a position"
     )
 
+    # Interpolates `position` between fetches; see attach_clock()
+    _clock: PlaybackClock | None = PrivateAttr(default=None)
+
+    @classmethod
+    def from_dbus_dict(cls, properties: dict[str, Any]) -> PlayerState:
+        return cls(**cls._process_dbus_dict(properties))
+
+    @staticmethod
+    def _process_dbus_dict(properties: dict[str, Any]) -> dict[str, Any]:
+        processed_data: dict[str, Any] = {}
+        for key, value in properties.items():
+            field = PLAYER_PROPERTIES.get(key)
+            if field is None:
+                continue
+            if isinstance(value, Variant):
+                value = value.value
+            if field == "metadata":
+                value = TrackMetadata.from_dbus_dict(value)
+            processed_data[field] = value
+        return processed_data
+
+    def with_dbus_changes(self, changed_properties: dict[str, Any]) -> PlayerState:
+        """Return a new state with a PropertiesChanged payload merged in."""
+        data = {name: getattr(self, name) for name in type(self).model_fields}
+        data.update(self._process_dbus_dict(changed_properties))
+        return type(self)(**data)
+
     @field_validator("volume")
     @classmethod
     def clamp_volume(cls, v: float) -> float:
@@ -211,6 +252,18 @@ class PlayerState(BaseModel):
 
         return self
 
+    def attach_clock(self, clock: PlaybackClock) -> PlayerState:
+        """Derive the live position from `clock` instead of the fetched value."""
+        self._clock = clock
+        return self
+
+    @property
+    def current_position(self) -> int:
+        # in microseconds
+        if self._clock is not None:
+            return self._clock.position()
+        return self.position
+
     def is_muted(self) -> bool:
         return self.volume <= 0.01
 
@@ -221,14 +274,14 @@ class PlayerState(BaseModel):
     def progress_percentage(self) -> float:
         if self.metadata.length <= 0:
             return 0.0
-        return min(100.0, (self.position / self.metadata.length) * 100.0)
+        return min(100.0, (self.current_position / self.metadata.length) * 100.0)
 
     @property
     def time_remaining(self) -> int:
         # in microseconds
         if self.metadata.length <= 0:
             return 0
-        return max(0, self.metadata.length - self.position)
+        return max(0, self.metadata.length - self.current_position)
 
     @property
     def controls_summary(self) -> str:
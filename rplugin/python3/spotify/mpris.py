@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from enum import StrEnum
+
+
+class PlaybackStatus(StrEnum):
+    PLAYING = "Playing"
+    PAUSED = "Paused"
+    STOPPED = "Stopped"
+
+
+class LoopStatus(StrEnum):
+    NONE = "None"
+    PLAYLIST = "Playlist"
+    TRACK = "Track"
+
+
+# MPRIS `org.mpris.MediaPlayer2.Player` property names mapped to PlayerState fields
+PLAYER_PROPERTIES: dict[str, str] = {
+    "PlaybackStatus": "playback_status",
+    "LoopStatus": "loop_status",
+    "Rate": "rate",
+    "Shuffle": "shuffle",
+    "Volume": "volume",
+    "Position": "position",
+    "Metadata": "metadata",
+    "CanControl": "can_control",
+    "CanGoNext": "can_go_next",
+    "CanGoPrevious": "can_go_previous",
+    "CanPlay": "can_play",
+    "CanPause": "can_pause",
+    "CanSeek": "can_seek",
+}
+
+# Every MPRIS player owns a bus name under this namespace, e.g.
+# org.mpris.MediaPlayer2.spotify or org.mpris.MediaPlayer2.vlc.instance1234
+BUS_NAME_NAMESPACE = "org.mpris.MediaPlayer2"
+OBJECT_PATH = "/org/mpris/MediaPlayer2"
+PLAYER_INTERFACE = "org.mpris.MediaPlayer2.Player"
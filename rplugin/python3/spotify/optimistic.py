@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+from typing import final
+
+from dbus_fast.signature import Variant
+
+from .commands import PlayerCommand
+from .metrics import LatencyHistogram
+from .mpris import PLAYER_PROPERTIES
+from .snapshot import PlayerSnapshot
+from .store import PlayerStateStore
+
+logger = logging.getLogger(__name__)
+
+# Display fields whose change shows a press took effect, see display.py
+_VISIBLE_EFFECTS: dict[PlayerCommand, frozenset[str]] = {
+    PlayerCommand.TOGGLE: frozenset({"status"}),
+    PlayerCommand.SHUFFLE: frozenset({"shuffle"}),
+    PlayerCommand.NEXT: frozenset({"title", "artist", "length"}),
+    PlayerCommand.PREVIOUS: frozenset({"title", "artist", "length"}),
+    PlayerCommand.SEEK: frozenset({"position"}),
+    PlayerCommand.VOLUME: frozenset({"volume"}),
+}
+
+
+def _property(state: PlayerSnapshot, name: str) -> Any:
+    return getattr(state, PLAYER_PROPERTIES[name])
+
+
+@final
+class Predictions:
+    """
+    Property changes commands are expected to cause, applied to the store
+    before the player reports them.
+
+    The player's next PropertiesChanged for a predicted property, or the next
+    full fetch, settles it: confirmed when the values match, corrected
+    otherwise (the store then holds the player's value either way). Whatever
+    is still unsettled when the timeout expires, or when the command fails, is
+    rolled back to the value from before the first prediction and
+    `on_rollback` is called. Must be used from the thread running `loop`.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        store: PlayerStateStore,
+        on_rollback: Callable[[], None],
+        timeout: float = 1.0,
+    ):
+        """
+        Args:
+            loop: The event loop the rollback timer runs on.
+            store: The store predictions are applied to.
+            on_rollback: Called after unconfirmed predictions were undone.
+            timeout: Seconds the player has to confirm a prediction.
+        """
+        self._loop = loop
+        self._store = store
+        self._on_rollback = on_rollback
+        self.timeout = timeout
+        # MPRIS property name -> (predicted value, value before predicting)
+        self._pending: dict[str, tuple[Any, Any]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+        self.made = 0
+        self.confirmed = 0
+        self.corrected = 0
+        self.rolled_back = 0
+
+    def predict(self, changes: dict[str, Any]) -> bool:
+        """Apply `changes` to the stored state; False if there was none to change."""
+        state = self._store.state
+        if state is None or not changes:
+            return False
+        for name, value in changes.items():
+            pending = self._pending.get(name)
+            base = pending[1] if pending is not None else _property(state, name)
+            if value == base:
+                # Predicted back to where it started, e.g. toggled twice
+                self._pending.pop(name, None)
+            else:
+                self._pending[name] = (value, base)
+        self._store.apply_prediction(changes)
+        self.made += 1
+        self._arm()
+        return True
+
+    def reconcile(
+        self, changed_properties: dict[str, Any], settle: bool = True
+    ) -> dict[str, Any]:
+        """
+        Settle predictions against a PropertiesChanged payload from the player.
+
+        Args:
+            changed_properties: The payload, before it is merged into the store.
+            settle: False while more commands are on their way; a mismatch is
+                    then an intermediate state (e.g. the first of several
+                    volume steps) and the prediction stays pending.
+
+        Returns:
+            The predictions to apply again on top of the merged payload.
+        """
+        keep: dict[str, Any] = {}
+        if not self._pending:
+            return keep
+        for name, value in changed_properties.items():
+            pending = self._pending.get(name)
+            if pending is None:
+                continue
+            if type(value) is Variant:
+                value = value.value
+            if value == pending[0]:
+                self.confirmed += 1
+            elif not settle:
+                keep[name] = pending[0]
+                continue
+            else:
+                logger.info("Predicted %s=%r, player has %r.", name, pending[0], value)
+                self.corrected += 1
+            del self._pending[name]
+        if not self._pending:
+            self._disarm()
+        return keep
+
+    def reconcile_state(
+        self, state: PlayerSnapshot, settle: bool = True
+    ) -> dict[str, Any]:
+        """Settle predictions against a freshly fetched state, like reconcile()."""
+        return self.reconcile(
+            {name: _property(state, name) for name in self._pending}, settle
+        )
+
+    def rollback(self) -> None:
+        """Undo the predictions the player has not confirmed."""
+        self._disarm()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        self.rolled_back += len(pending)
+        logger.info("Rolling back unconfirmed predictions: %s", sorted(pending))
+        self._store.apply_prediction(
+            {name: base for name, (_, base) in pending.items()}
+        )
+        self._on_rollback()
+
+    def clear(self) -> None:
+        """Forget pending predictions without touching the store."""
+        self._disarm()
+        self._pending.clear()
+
+    def _arm(self) -> None:
+        self._disarm()
+        if self._pending:
+            self._timer = self._loop.call_later(self.timeout, self.rollback)
+
+    def _disarm(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "made": self.made,
+            "pending": len(self._pending),
+            "confirmed": self.confirmed,
+            "corrected": self.corrected,
+            "rolled_back": self.rolled_back,
+        }
+
+
+@final
+class PerceivedLatency:
+    """
+    Milliseconds from a key press to the statusline showing its effect.
+
+    A press is marked when its command handler runs and observed once a push
+    to Lua carries one of the display fields that command changes. Presses
+    whose effect never shows up within `max_age` seconds count as missed,
+    and are dropped on the next mark or stats read even if nothing is pushed.
+    Both ends run on the Neovim main thread.
+    """
+
+    def __init__(self, max_age: float = 5.0):
+        """
+        Args:
+            max_age: Seconds after which an unobserved press counts as missed.
+        """
+        self.max_age = max_age
+        self._marks: deque[tuple[float, frozenset[str]]] = deque()
+        self.histogram = LatencyHistogram()
+        self.last_ms = 0.0
+        self.missed = 0
+
+    def mark(self, command: PlayerCommand) -> None:
+        now = time.perf_counter()
+        self._expire(now)
+        self._marks.append((now, _VISIBLE_EFFECTS[command]))
+
+    def _expire(self, now: float) -> None:
+        # Marks are in press order, so the expired ones are at the front
+        marks = self._marks
+        while marks and now - marks[0][0] > self.max_age:
+            marks.popleft()
+            self.missed += 1
+
+    def observe(self, fields: Iterable[str]) -> None:
+        """Record the presses whose effect the push of `fields` made visible."""
+        if not self._marks:
+            return
+        now = time.perf_counter()
+        fields = frozenset(fields)
+        waiting: deque[tuple[float, frozenset[str]]] = deque()
+        for pressed, effects in self._marks:
+            if effects & fields:
+                self.last_ms = (now - pressed) * 1000
+                self.histogram.record(self.last_ms)
+            elif now - pressed > self.max_age:
+                self.missed += 1
+            else:
+                waiting.append((pressed, effects))
+        self._marks = waiting
+
+    def stats(self) -> dict[str, float]:
+        self._expire(time.perf_counter())
+        stats: dict[str, float] = {
+            "observed": self.histogram.calls,
+            "missed": self.missed,
+        }
+        if self.histogram.calls:
+            stats["last_ms"] = round(self.last_ms, 3)
+        stats.update(self.histogram.latency_stats())
+        return stats
@@ -2,26 +2,59 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
+import time
+from collections import deque
+from collections.abc import Callable
+from collections.abc import Coroutine
+from functools import partial
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import final
 
 import pynvim
-from dbus_fast import BusType
-from dbus_fast.aio import MessageBus
-from dbus_fast.aio.proxy_object import ProxyInterface
-from dbus_fast.aio.proxy_object import ProxyObject
-from dbus_fast.errors import DBusError
-
-# Assuming your interface and models are correctly placed
-from .interface import Spotify
-from .interface import SpotifyService
-from .models import PlaybackStatus
+
+from .commands import CommandQueue
+from .commands import PlayerCommand
+from .commands import QueuedCommand
+from .commands import parse_adjustment
+from .commands import predicted_changes
+from .display import EMPTY_DISPLAY
+from .display import diff_display
+from .display import player_fields
+from .metrics import CallMetrics
+from .metrics import format_stats
+from .progress import ProgressScheduler
+from .progress import format_progress
 from .runner import AsyncRunner
+from .runner import loop_factory
+from .scheduler import RefreshScheduler
+from .tracing import DEFAULT_TRACE_FILE
+from .tracing import tracer
+
+# The rplugin host imports this module on startup for every Python plugin, so
+# pydantic, dbus_fast and the modules built on them are only imported once a
+# Spotify code path runs (the plugin is instantiated on its first handler call).
+if TYPE_CHECKING:
+    from .broker import BrokerClient
+    from .interface import Spotify
+    from .interface import SpotifyService
+    from .logs import PluginLogging
+    from .mpris import PlaybackStatus
+    from .optimistic import PerceivedLatency
+    from .optimistic import Predictions
+    from .registry import PlayerRegistry
+    from .snapshot import PlayerSnapshot
+    from .store import PlayerStateStore
+    from .supervisor import ConnectionSupervisor
 
-# Configure logging for debugging if needed
-logging.basicConfig(level=logging.DEBUG, filename="/tmp/spotify_nvim.log", filemode="w")
 logger = logging.getLogger(__name__)
 
+# Merges changed display fields into lib.spotify's state table in a single RPC
+_UPDATE_DISPLAY_LUA = 'return require("lib.spotify").update(...)'
+# Redraw spans Lua recorded while tracing, handed over for a dump
+_TAKE_TRACE_EVENTS_LUA = 'return require("lib.spotify").take_trace_events()'
+
 
 @final
 @pynvim.plugin
@@ -31,143 +64,325 @@ class SpotifyNvimPlugin:
     # Removed DBUS_DAEMON constants, no longer needed
 
     def __init__(self, nvim: pynvim.Nvim):
+        started = time.perf_counter()
+        from .interface import Spotify
+        from .interface import SpotifyService
+        from .introspection import IntrospectionCache
+        from .introspection import default_cache_path
+        from .logs import PluginLogging
+        from .optimistic import PerceivedLatency
+        from .optimistic import Predictions
+        from .registry import PlayerRegistry
+        from .store import PlayerStateStore
+        from .supervisor import ConnectionSupervisor
+
+        # Queued to a background writer; the level is updated from the config
+        self.logging: PluginLogging = PluginLogging()
+        self.logging.start()
         logger.info("hello")
         self.nvim = nvim
-        self.runner = AsyncRunner()
+        # The loop starts before the Lua config is read, so it is picked by
+        # environment: "auto" (uvloop if installed), "asyncio" or "uvloop"
+        self.runner = AsyncRunner(
+            loop_factory=loop_factory(os.environ.get("SPOTIFY_NVIM_LOOP", "auto"))
+        )
+        # Command handlers only hand presses to the queue; a few at a time is plenty
+        self.runner.set_group_limit("commands", 4)
         self.pause_timer: asyncio.TimerHandle | None = None
         self.last_status: PlaybackStatus | None = None
-        self.monitor_bus: MessageBus | None = None
-        # Store the proxy and interface for Spotify properties
-        self.spotify_proxy: ProxyObject | None = None
-        self.spotify_props_interface: ProxyInterface | None = None
         self.spotify_service: SpotifyService = SpotifyService.DESKTOP  # Default
+        # One pooled connection shared by signal monitoring, updates and commands,
+        # replaced by a BrokerClient in async_init when the broker is enabled
+        self.spotify: Spotify | BrokerClient
+        # Every MPRIS player on the bus; the client follows the active one
+        self.players: PlayerRegistry | None = PlayerRegistry()
+        self.introspection_cache = IntrospectionCache(default_cache_path())
+        spotify = Spotify(
+            service=self.spotify_service,
+            introspection_cache=self.introspection_cache,
+            registry=self.players,
+        )
+        self._use_client(spotify)
+        self.use_broker = False
+        self._config_loaded = asyncio.Event()
+        # Player state kept current from signal payloads
+        self.store: PlayerStateStore = PlayerStateStore()
         self.last_formatted_text: str | None = None  # Track text last sent to Lua
         self.icons: dict[str, str] = {"playing": "▶", "paused": "⏸"}  # Default icons
+        self.pause_timeout_sec = 30.0
+        self.refresh_quiet_window = 0.05  # Seconds a signal burst must settle for
+        # Seconds between Position polls that correct the local playback clock
+        self.position_drift_check_sec = 60.0
+        self.drift_timer: asyncio.TimerHandle | None = None
+        self.progress_bar_width = 10
+        # Display state mirrored into lib.spotify's state table, see _set_display()
+        self.display: dict[str, Any] = dict(EMPTY_DISPLAY)
+        self._display_flush_scheduled = False
+        # What Lua has been sent; flushes only carry fields that differ from it
+        self._pushed_display: dict[str, Any] = {}
+        # Failed pushes in a row; only the first is retried right away
+        self._push_failures = 0
+        # Traced updates the next flush carries to Lua, see tracing.py
+        self._trace_updates: list[int] = []
+
+        # Collapses signal bursts and command follow-ups into one refresh
+        self.refresh = RefreshScheduler(
+            self.runner.get_loop(),
+            partial(self.runner.spawn, group="refresh"),
+            self._refresh,
+            self.refresh_quiet_window,
+        )
+        # Attaches when the player appears and backs off on transient failures;
+        # dropped in async_init when the broker owns the connection instead
+        self.supervisor: ConnectionSupervisor | None = ConnectionSupervisor(
+            spotify,
+            self.runner.get_loop(),
+            on_change=self._on_connection_changed,
+            # A newer attach supersedes one still in flight
+            spawn=partial(self.runner.spawn, group="connect"),
+        )
+        # Runs player commands in order, merging presses that pile up behind a
+        # running one; a single refresh follows once the queue drains
+        self.commands = CommandQueue(
+            self.runner.get_loop(),
+            # Apart from "commands", whose limit only throttles the handlers
+            partial(self.runner.spawn, group="command_queue"),
+            self._ensure_connected,
+            lambda: self.store.state,
+            on_drained=lambda: self.refresh.request(fetch=True),
+            on_error=self._on_command_error,
+        )
+        # Commands show their expected effect at once; the player's signals
+        # confirm it or it is rolled back
+        self.predictions: Predictions = Predictions(
+            self.runner.get_loop(), self.store, self._on_predictions_rolled_back
+        )
+        # Key press to statusline change, measured on the main thread
+        self.latency: PerceivedLatency = PerceivedLatency()
+        # Pushes to Lua: the wait for the main thread and the exec_lua itself
+        self.metrics = CallMetrics()
+        # Wakes only on displayed-second boundaries while playing and focused
+        self.progress = ProgressScheduler(
+            self.runner.get_loop(), self.store.clock, self._render_progress
+        )
+
+        # Commands issued before background init finishes are replayed after it
+        self._ready = False
+        self._pending_commands: deque[
+            tuple[str, Callable[[], Coroutine[Any, Any, None]]]
+        ] = deque()
+        # Milliseconds from construction to each startup milestone
+        self._started = started
+        self.startup_times: dict[str, float] = {}
+
+        # Nothing below blocks the remote-plugin host: config loads on the main
+        # thread once it is idle, D-Bus setup runs on the AsyncRunner loop.
+        self.nvim.async_call(self._load_config)
+        self.runner.call_soon(self._start_background_init)
+        self._mark_startup("constructor")
 
-        # --- Config Loading (remains the same) ---
-        lua_config = {}  # Default empty config
+    def _use_client(self, client: Spotify | BrokerClient):
+        """Route updates and commands through `client` and subscribe to its signals."""
+        self.spotify = client
+        # The handlers are re-attached by the client on every (re)connect
+        client.add_properties_changed_handler(self._handle_spotify_properties_changed)
+        client.add_seeked_handler(self._handle_spotify_seeked)
+
+    def _mark_startup(self, milestone: str):
+        """Record how long after construction a startup milestone was reached."""
+        if milestone not in self.startup_times:
+            self.startup_times[milestone] = (time.perf_counter() - self._started) * 1000
+            logger.info(
+                f"Startup milestone '{milestone}' at {self.startup_times[milestone]:.1f}ms"
+            )
+
+    def _load_config(self):
+        """Load the Lua config in one RPC. Runs on the Neovim main thread."""
         try:
-            self.nvim.exec_lua("spotify = require('lib.spotify')")
-            config = self.nvim.lua.spotify.get_config()
-            logger.info(f"Successfully loaded Lua config. {config=}")
             lua_config = self.nvim.exec_lua(
-                'return require("lib.spotify").get_config()'
+                'local spotify = require("lib.spotify")\n'
+                "spotify.track_focus()\n"
+                "return spotify.get_config()"
             )
             logger.info(f"Successfully loaded Lua config. {lua_config}")
 
-            # Now use the loaded (or default empty) lua_config table
-            self.pause_timeout_sec = 30.0
+            self.refresh_quiet_window = (
+                float(lua_config.get("refresh_quiet_window_ms", 50)) / 1000
+            )
+            self.refresh.quiet_window = self.refresh_quiet_window
+            self.position_drift_check_sec = float(
+                lua_config.get("position_drift_check_sec", 60)
+            )
+            self.progress_bar_width = int(lua_config.get("progress_bar_width", 10))
+            self.commands.adjust_interval = (
+                float(lua_config.get("adjust_interval_ms", 100)) / 1000
+            )
+            self.icons.update(lua_config.get("icons") or {})
+            self.logging.set_level(str(lua_config.get("log_level", "info")))
+            if lua_config.get("trace"):
+                tracer.start()
+            if lua_config.get("loop_lag") and self.runner.lag is not None:
+                self.runner.call_soon(self.runner.lag.start)
+            self.use_broker = bool(lua_config.get("broker", False))
+            players = lua_config.get("players")
+            if isinstance(players, str):
+                players = [players]
+            if self.players is not None and players:
+                self.players.names = frozenset(players)
 
             logger.info(
                 f"Using config: timeout={self.pause_timeout_sec}, "
                 f"service={self.spotify_service}, "
-                f"icons={self.icons}"
+                f"icons={self.icons}, "
+                f"quiet_window={self.refresh_quiet_window}, "
+                f"drift_check={self.position_drift_check_sec}, "
+                f"broker={self.use_broker}, "
+                f"players={players or 'all'}"
             )
         # Keep general exception handling for Python errors during processing
         except pynvim.NvimError as e:
             logger.error(f"NvimError accessing Lua API: {e}. Using defaults.")
-            self.nvim.async_call(
-                self.nvim.err_write,
+            self.nvim.err_write(
                 f"[SpotifyNvim] NvimError accessing Lua API: {e}. Using defaults.\n",
             )
-            self.pause_timeout_sec = 30.0
         except (ValueError, TypeError) as e:
             logger.error(f"Error processing config values: {e}. Using defaults.")
-            self.nvim.async_call(
-                self.nvim.err_write,
+            self.nvim.err_write(
                 f"[SpotifyNvim] Error processing config values: {e}. Using defaults.\n",
             )
-            self.pause_timeout_sec = 30.0
         except Exception as e:
             logger.exception(f"Unexpected error loading config: {e}. Using defaults.")
-            self.nvim.async_call(
-                self.nvim.err_write,
+            self.nvim.err_write(
                 f"[SpotifyNvim] Unexpected error loading config: {e}. Using defaults.\n",
             )
-            self.pause_timeout_sec = 30.0
+        self._mark_startup("config")
+        self.runner.call_soon(self._config_loaded.set)
 
-        # Start initialization in the background loop
+    def _start_background_init(self):
+        """Kick off async_init on the AsyncRunner loop without waiting for it."""
+        self.runner.spawn(self._background_init(), group="init", key="init")
+
+    async def _background_init(self):
         try:
-            self.runner.run_coroutine_sync(self.async_init(), timeout=15.0)
+            async with asyncio.timeout(15.0):
+                await self.async_init()
         except Exception as e:
-            logger.exception("Failed during synchronous part of initialization:")
+            logger.exception("Failed during background initialization:")
             self.nvim.async_call(
                 self.nvim.err_write, f"[SpotifyNvim] Failed to initialize: {e}\n"
             )
-            # Prevent further operation if init fails badly
-            if self.runner:  # Check if runner exists before shutdown
-                self.runner.shutdown()
+        finally:
+            self._ready = True
+            self._mark_startup("ready")
+            self._replay_pending_commands()
+
+    def _replay_pending_commands(self):
+        while self._pending_commands:
+            name, command = self._pending_commands.popleft()
+            logger.info(f"Replaying queued command '{name}'.")
+            self.runner.spawn(command(), group="commands")
+
+    def _submit_command(
+        self, name: str, command: Callable[[], Coroutine[Any, Any, None]]
+    ):
+        """Run a command coroutine on the loop, queueing it until init is done."""
+        if not (self.runner and self.runner._loop and self.runner._loop.is_running()):
+            logger.error(f"Cannot run {name}: AsyncRunner not ready.")
+            self.nvim.async_call(
+                self.nvim.err_write,
+                "[SpotifyNvim] Error: Async runner not available.\n",
+            )
+            return
+
+        def dispatch():
+            if not self._ready:
+                logger.info(f"Queueing command '{name}' until initialization is done.")
+                self._pending_commands.append((name, command))
+                return
+            self.runner.spawn(command(), group="commands")
+
+        self.runner.call_soon(dispatch)
 
     async def async_init(self):
         """Perform asynchronous initialization and set up signal monitoring."""
         logger.info("Starting async initialization...")
+        try:
+            # The config decides whether to connect directly or via the broker
+            async with asyncio.timeout(2.0):
+                await self._config_loaded.wait()
+        except TimeoutError:
+            logger.warning("Config not loaded in time; connecting with defaults.")
+        if self.use_broker:
+            from .broker import BrokerClient
+
+            # The broker supervises its own connection and forwards owner changes
+            self.supervisor = None
+            self.players = None
+            client = BrokerClient(
+                self.spotify_service, log_level=self.logging.level.lower()
+            )
+            client.add_name_owner_changed_handler(
+                self._handle_spotify_name_owner_changed
+            )
+            self._use_client(client)
         await self.connect_and_monitor_signals()
         # Perform an initial status update only if signal setup was successful
-        if self.spotify_props_interface:
+        if self.spotify.connected:
+            self._mark_startup("connected")
             await self.update_status()
+            self._mark_startup("first_status")
         else:
             logger.warning(
                 "Skipping initial status update as signal monitoring setup failed."
             )
         logger.info("Async initialization complete.")
 
-    async def connect_and_monitor_signals(self):
-        """Connect to D-Bus, get Spotify proxy, and attach signal handler."""
-        try:
-            logger.info("Connecting to session bus for signal monitoring...")
-            self.monitor_bus = await MessageBus(bus_type=BusType.SESSION).connect()
-            logger.info(f"Connected to bus: {self.monitor_bus.unique_name}")
-
-            # Introspect the Spotify service to get its interfaces
-            logger.info(
-                f"Introspecting Spotify service: {self.spotify_service} at {Spotify.PATH}"
-            )
-            introspection = await self.monitor_bus.introspect(
-                str(self.spotify_service), Spotify.PATH
-            )
+    def _on_connection_changed(self):
+        """
+        Another player became active, or the player or bus went away. Render
+        the state the registry tracked for the new player; fetch otherwise.
+        """
+        self.predictions.clear()
+        state = self.players.active_state() if self.players is not None else None
+        if state is None:
+            self.refresh.request(fetch=True)
+            return
+        self.store.replace(state)
+        self.refresh.request()
 
-            # Get the proxy object for the Spotify service
-            self.spotify_proxy = self.monitor_bus.get_proxy_object(
-                str(self.spotify_service), Spotify.PATH, introspection
-            )
-            logger.info("Got Spotify proxy object.")
+    async def _ensure_connected(self) -> Spotify | BrokerClient:
+        """The connected client, going through the supervisor when there is one."""
+        if self.supervisor is not None:
+            return await self.supervisor.ensure_connected()
+        return await self.spotify.ensure_connected()
 
-            # Get the standard Properties interface from the Spotify proxy
-            self.spotify_props_interface = self.spotify_proxy.get_interface(
-                "org.freedesktop.DBus.Properties"
-            )
-            logger.info("Got Spotify Properties interface.")
+    async def connect_and_monitor_signals(self):
+        """Connect the shared Spotify client, which attaches the signal handler."""
+        from dbus_fast.errors import DBusError
 
-            # Register the handler directly on the interface for the PropertiesChanged signal
-            # The callback (_handle_spotify_properties_changed) will receive the signal's arguments
-            self.spotify_props_interface.on_properties_changed(
-                self._handle_spotify_properties_changed
-            )
-            logger.info("Registered 'on_properties_changed' signal handler.")
+        from .interface import PlayerNotRunning
+        from .supervisor import PlayerUnavailable
 
+        try:
+            logger.info(f"Connecting to Spotify service: {self.spotify_service}")
+            await self._ensure_connected()
+        except PlayerNotRunning:
+            # Not an error: the supervisor attaches once the player starts
+            logger.info(f"{self.spotify_service} is not running yet.")
+        except PlayerUnavailable as e:
+            logger.warning(f"Could not connect yet: {e}")
         except DBusError as e:
             logger.error(f"D-Bus error during signal setup: {e}")
             self.nvim.async_call(
                 self.nvim.err_write,
                 f"[SpotifyNvim] D-Bus error connecting to {self.spotify_service}: {e}. Is it running?\n",
             )
-            # Clean up partially connected resources
-            if self.monitor_bus and self.monitor_bus.connected:
-                self.monitor_bus.disconnect()
-            self.monitor_bus = None
-            self.spotify_proxy = None
-            self.spotify_props_interface = None
         except Exception as e:
             logger.exception("Unexpected error during signal setup:")
             self.nvim.async_call(
                 self.nvim.err_write,
                 f"[SpotifyNvim] Unexpected error setting up signals: {e}\n",
             )
-            if self.monitor_bus and self.monitor_bus.connected:
-                self.monitor_bus.disconnect()
-            self.monitor_bus = None
-            self.spotify_proxy = None
-            self.spotify_props_interface = None
 
     def _handle_spotify_properties_changed(
         self,
@@ -179,41 +394,107 @@ class SpotifyNvimPlugin:
         Callback executed when Spotify emits PropertiesChanged signal.
         Runs in the AsyncRunner's event loop thread.
         """
-        logger.debug(
-            f"Signal received: interface='{interface_name}', "
-            f"changed={list(changed_properties.keys())}, invalidated={invalidated_properties}"
-        )
+        update = self._begin_update("PropertiesChanged")
+        with tracer.span("PropertiesChanged", "signal", update=update):
+            self._apply_properties_changed(
+                interface_name, changed_properties, invalidated_properties
+            )
+
+    def _apply_properties_changed(
+        self,
+        interface_name: str,
+        changed_properties: dict[str, Any],
+        invalidated_properties: list[str],
+    ):
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Signal received: interface='%s', changed=%s, invalidated=%s",
+                interface_name,
+                list(changed_properties),
+                invalidated_properties,
+            )
 
         # We only care about changes to the Player interface properties
-        if interface_name == Spotify.PLAYER:
-            # Check if relevant properties (PlaybackStatus or Metadata) were changed
-            if (
-                "PlaybackStatus" in changed_properties
-                or "Metadata" in changed_properties
-            ):
+        if interface_name != self.spotify.PLAYER:
+            logger.debug(
+                "Ignoring PropertiesChanged signal for non-player interface: %s",
+                interface_name,
+            )
+            return
+
+        # Mismatches while commands are still running are intermediate states
+        keep = self.predictions.reconcile(
+            changed_properties, settle=not self.commands.busy
+        )
+        if not self.store.apply_changes(changed_properties, invalidated_properties):
+            logger.info(
+                "No usable state for delta (invalidated=%s). Requesting full status update.",
+                invalidated_properties,
+            )
+            self.refresh.request(fetch=True)
+        # Check if relevant properties (PlaybackStatus or Metadata) were changed
+        elif "PlaybackStatus" in changed_properties or "Metadata" in changed_properties:
+            if logger.isEnabledFor(logging.INFO):
                 logger.info(
-                    f"Relevant property changed ({list(changed_properties.keys())}). Scheduling status update."
+                    "Relevant property changed (%s). Requesting render.",
+                    list(changed_properties),
                 )
-                try:
-                    loop = self.runner.get_loop()
-                    if loop.is_running():
-                        loop.create_task(self.update_status())
-                    else:
-                        logger.warning(
-                            "Event loop not running, cannot schedule update_status task."
-                        )
-                except RuntimeError:
-                    logger.error(
-                        "Failed to schedule update: AsyncRunner loop unavailable."
-                    )
-            else:
+            self.store.apply_prediction(keep)
+            self.refresh.request()
+        else:
+            # Volume, shuffle, loop and the Can* flags are display fields too
+            if logger.isEnabledFor(logging.DEBUG):
                 logger.debug(
-                    "Ignoring PropertiesChanged signal for irrelevant player properties."
+                    "Merged PropertiesChanged signal for %s.", list(changed_properties)
                 )
-        else:
-            logger.debug(
-                f"Ignoring PropertiesChanged signal for non-player interface: {interface_name}"
-            )
+            self.store.apply_prediction(keep)
+            self.refresh.request()
+
+    def _handle_spotify_seeked(self, position: int):
+        """Resync the playback clock from a Player.Seeked signal."""
+        logger.debug("Seeked signal received: position=%d", position)
+        update = self._begin_update("Seeked")
+        with tracer.span("Seeked", "signal", update=update):
+            self.store.seeked(position)
+            self.progress.refresh()
+        self._end_unpushed_updates()
+
+    def _handle_spotify_name_owner_changed(
+        self, name: str, old_owner: str, new_owner: str
+    ):
+        """The player started, exited or restarted; resync with a full fetch."""
+        logger.info(f"Owner of {name} changed: '{old_owner}' -> '{new_owner}'")
+        self.refresh.request(fetch=True)
+
+    async def _refresh(self, fetch: bool):
+        """Run one coalesced refresh: a full fetch, or a render of the merged state."""
+        with tracer.span(
+            "refresh", "schedule", fetch=fetch, updates=self._trace_updates.copy()
+        ):
+            state = self.store.state
+            if fetch or state is None:
+                await self.update_status()
+            else:
+                try:
+                    with tracer.span("render"):
+                        self._render_state(state)
+                except Exception:
+                    logger.exception("Unexpected error rendering merged Spotify state:")
+        self._end_unpushed_updates()
+
+    def _begin_update(self, source: str) -> int | None:
+        """Trace an update until the next push to Lua. Runs on the AsyncRunner loop."""
+        update = tracer.begin_update(source)
+        if update is not None:
+            self._trace_updates.append(update)
+        return update
+
+    def _end_unpushed_updates(self):
+        """Close the traces of updates that left the display unchanged."""
+        if self._trace_updates and not self._display_flush_scheduled:
+            for update in self._trace_updates:
+                tracer.end_update(update, pushed=False)
+            self._trace_updates.clear()
 
     # --- Timer and Lua update helpers (remain the same) ---
     def _cancel_pause_timer(self):
@@ -230,18 +511,52 @@ class SpotifyNvimPlugin:
             loop = self.runner.get_loop()
             if loop.is_running():
                 logger.debug(
-                    f"Starting pause timer for {self.pause_timeout_sec} seconds."
+                    "Starting pause timer for %s seconds.", self.pause_timeout_sec
                 )
                 self.pause_timer = loop.call_later(
-                    self.pause_timeout_sec,
-                    # Schedule the update to clear text on the main thread
-                    lambda: self.nvim.async_call(self._update_nvim_state, ""),
+                    self.pause_timeout_sec, self._on_pause_timeout
                 )
             else:
                 logger.warning("Event loop not running, cannot start pause timer.")
         except RuntimeError:  # If runner/loop isn't available
             logger.error("Cannot start pause timer: Event loop unavailable.")
 
+    def _on_pause_timeout(self):
+        """Hide the track info and progress of a player left paused."""
+        self._set_display(text="", icon="", progress="")
+
+    def _schedule_drift_check(self):
+        """While playing, occasionally compare the playback clock with Position."""
+        state = self.store.state
+        if state is None or not state.is_playing():
+            self._cancel_drift_check()
+            return
+        if self.drift_timer is None:
+            self.drift_timer = self.runner.get_loop().call_later(
+                self.position_drift_check_sec,
+                lambda: self.runner.spawn(
+                    self._check_drift(), group="drift", key="drift"
+                ),
+            )
+
+    def _cancel_drift_check(self):
+        if self.drift_timer:
+            self.drift_timer.cancel()
+            self.drift_timer = None
+
+    async def _check_drift(self):
+        self.drift_timer = None
+        try:
+            async with asyncio.timeout(3):
+                position = await self.spotify.get_position()
+        except Exception as e:
+            logger.warning(f"Position drift check failed: {e}")
+        else:
+            drift = self.store.clock.check_drift(position)
+            logger.debug("Playback clock drift: %dus", drift)
+            self.progress.refresh()
+        self._schedule_drift_check()
+
     def _format_track_py(self, status_str: str, track_info: str) -> str:
         """Internal Python equivalent of Lua format_track for comparison."""
         if not track_info:
@@ -255,134 +570,249 @@ class SpotifyNvimPlugin:
             return f"{paused_icon} {track_info}"
         return ""  # Mimic Lua behavior for other states
 
-    def _update_nvim_state(self, final_text: str):
+    def _set_display(self, **fields: Any):
         """
-        Calls the necessary Lua functions on the Neovim main thread.
-        This function MUST be called via nvim.async_call.
+        Update fields of the display state. Changes made within one loop
+        iteration reach Neovim together in a single RPC. Runs on the
+        AsyncRunner loop.
         """
-        # Check if the text actually needs updating in Lua
-        if self.last_formatted_text == final_text:
-            logger.debug(f"Skipping nvim update as text is unchanged: '{final_text}'")
+        if all(self.display[name] == value for name, value in fields.items()):
             return
+        self.display.update(fields)
+        if not self._display_flush_scheduled:
+            self._display_flush_scheduled = True
+            self.runner.get_loop().call_soon(self._flush_display)
+
+    def _flush_display(self):
+        """Send the fields changed since the last push. Runs on the AsyncRunner loop."""
+        self._display_flush_scheduled = False
+        changes = diff_display(self.display, self._pushed_display)
+        if not changes:
+            logger.debug("Skipping nvim update as display is unchanged.")
+            self._end_unpushed_updates()
+            return
+        self._pushed_display.update(changes)
+        updates, self._trace_updates = self._trace_updates, []
+        tracer.instant("nvim.async_call", "nvim", updates=updates)
+        self.nvim.async_call(
+            self._update_nvim_state, changes, time.perf_counter(), updates
+        )
 
-        logger.debug(f"Updating Neovim Lua state with text: '{final_text}'")
+    def _update_nvim_state(
+        self, changes: dict[str, Any], scheduled: float, updates: list[int]
+    ):
+        """
+        Merge changed display fields into Lua with one exec_lua round trip.
+        This function MUST be called via nvim.async_call.
+        """
+        self.metrics.histogram("main_thread_wait").record(
+            (time.perf_counter() - scheduled) * 1000
+        )
+        logger.debug("Updating Neovim Lua state with changes: %s", changes)
         try:
-            # Use pcall for safety, calling the Lua update function
-            self.nvim.exec_lua("spotify = require('lib.spotify')")
-            self.nvim.lua.spotify.update_track(final_text)
+            with (
+                self.metrics.timed("update_nvim_state"),
+                tracer.span("update_nvim_state", "nvim", updates=updates),
+            ):
+                # With tracing on, Lua times the lualine refresh it schedules
+                trace = updates if tracer.enabled else None
+                self.nvim.exec_lua(_UPDATE_DISPLAY_LUA, changes, trace)
+            for update in updates:
+                tracer.end_update(update, pushed=True, fields=list(changes))
+            self.latency.observe(changes)
+            self._push_failures = 0
             # Update our internal cache *after* successful call
-            self.last_formatted_text = final_text
+            if "text" in changes:
+                self.last_formatted_text = changes["text"]
         except pynvim.NvimError as e:
-            logger.error(f"NvimError calling Lua function 'update_track': {e}")
+            logger.error(f"NvimError calling Lua function 'update': {e}")
             self.nvim.err_write(f"[SpotifyNvim] Failed to update Lua state: {e}\n")
-            # Clear cache on error to force update next time
-            self.last_formatted_text = None
+            self._push_failed()
         except Exception as e:
-            logger.exception(f"Unexpected error calling Lua update_track: {e}")
+            logger.exception(f"Unexpected error calling Lua update: {e}")
             self.nvim.err_write(
                 f"[SpotifyNvim] Unexpected error updating Lua state: {e}\n"
             )
-            self.last_formatted_text = None
+            self._push_failed()
 
-    # --- Main Status Update Logic (remains the same) ---
-    async def update_status(self):
+    def _push_failed(self):
         """
-        Fetch status from Spotify (async) and schedule Neovim update (main thread).
+        Have the loop resend every field after a failed push. Runs on the main
+        thread; the display state belongs to the loop, so it is reset there.
         """
-        logger.debug("Attempting to update Spotify status...")
+        self._push_failures += 1
+        self.runner.call_soon(self._resend_display, self._push_failures == 1)
+
+    def _resend_display(self, flush: bool):
+        """
+        Forget what was pushed so the next flush resends every field, and flush
+        now if asked. Runs on the AsyncRunner loop.
+        """
+        self._pushed_display = {}
+        self.last_formatted_text = None
+        # Repeated failures wait for the next display change instead
+        if flush and not self._display_flush_scheduled:
+            self._flush_display()
+
+    def _render_progress(self):
+        """
+        Derive the progress component from the stored state. Runs on the
+        AsyncRunner loop, driven by the progress scheduler.
+        """
+        from .mpris import PlaybackStatus
+
+        state = self.store.state
+        progress_text = ""
+        position = 0
+        if (
+            state is not None
+            and state.metadata.title != "Unknown Title"
+            and state.playback_status in (PlaybackStatus.PLAYING, PlaybackStatus.PAUSED)
+        ):
+            position = state.current_position
+            progress_text = format_progress(
+                position, state.metadata.length, self.progress_bar_width
+            )
+        self._set_display(progress=progress_text, position=position // 1_000_000)
+
+    # --- Main Status Update Logic ---
+    def _render_state(self, player_state: PlayerSnapshot):
+        """
+        Derive the statusline text from a player state and schedule the Neovim
+        update (main thread) if it changed. Runs on the AsyncRunner loop.
+        """
+        from .mpris import PlaybackStatus
+
         intended_text = ""  # What we want to display
         needs_nvim_update = True  # Assume update is needed initially
 
-        try:
-            async with asyncio.timeout(5):
-                async with Spotify(service=self.spotify_service) as spotify:
-                    player_state = await spotify.getplayer_state()
-
-            current_status = player_state.playback_status
-            metadata = player_state.metadata
-            track_info = ""
-            status_str = str(current_status)  # Default status string
-
-            if (
-                metadata
-                and metadata.title != "Unknown Title"
-                and (
-                    current_status == PlaybackStatus.PLAYING
-                    or current_status == PlaybackStatus.PAUSED
-                )
-            ):
-                artist = (
-                    ", ".join(metadata.artist) if metadata.artist else "Unknown Artist"
-                )
-                title = metadata.title if metadata.title else "Unknown Title"
-                track_info = f"{artist} - {title}"
+        current_status = player_state.playback_status
+        metadata = player_state.metadata
+        track_info = ""
+        status_str = str(current_status)  # Default status string
 
-                if current_status == PlaybackStatus.PLAYING:
-                    status_str = "Playing"
-                    intended_text = self._format_track_py(status_str, track_info)
-                    self._cancel_pause_timer()
+        if (
+            metadata
+            and metadata.title != "Unknown Title"
+            and (
+                current_status == PlaybackStatus.PLAYING
+                or current_status == PlaybackStatus.PAUSED
+            )
+        ):
+            artist = ", ".join(metadata.artist) if metadata.artist else "Unknown Artist"
+            title = metadata.title if metadata.title else "Unknown Title"
+            track_info = f"{artist} - {title}"
+
+            if current_status == PlaybackStatus.PLAYING:
+                status_str = "Playing"
+                intended_text = self._format_track_py(status_str, track_info)
+                self._cancel_pause_timer()
 
-                elif current_status == PlaybackStatus.PAUSED:
-                    status_str = "Paused"
-                    intended_text = self._format_track_py(status_str, track_info)
+            elif current_status == PlaybackStatus.PAUSED:
+                status_str = "Paused"
+                intended_text = self._format_track_py(status_str, track_info)
 
-                    # Optimization: If paused, timer running, and text hasn't changed, skip update
+                # Optimization: If paused, timer running, and text hasn't changed, skip update
+                if (
+                    self.last_status == PlaybackStatus.PAUSED
+                    and self.pause_timer
+                    and not self.pause_timer.cancelled()
+                    and self.last_formatted_text == intended_text
+                ):
+                    logger.debug(
+                        "Status Paused, timer running, text unchanged. Skipping nvim update."
+                    )
+                    needs_nvim_update = False
+                else:
+                    # Start timer if status changed to paused or timer not running
                     if (
-                        self.last_status == PlaybackStatus.PAUSED
-                        and self.pause_timer
-                        and not self.pause_timer.cancelled()
-                        and self.last_formatted_text == intended_text
+                        self.last_status != PlaybackStatus.PAUSED
+                        or not self.pause_timer
+                        or self.pause_timer.cancelled()
                     ):
-                        logger.debug(
-                            "Status Paused, timer running, text unchanged. Skipping nvim update."
-                        )
-                        needs_nvim_update = False
-                    else:
-                        # Start timer if status changed to paused or timer not running
-                        if (
-                            self.last_status != PlaybackStatus.PAUSED
-                            or not self.pause_timer
-                            or self.pause_timer.cancelled()
-                        ):
-                            self._start_pause_timer()
+                        self._start_pause_timer()
 
-            else:
-                # Not playing/paused, or invalid metadata -> Clear text
-                intended_text = ""
-                self._cancel_pause_timer()
+        else:
+            # Not playing/paused, or invalid metadata -> Clear text
+            intended_text = ""
+            self._cancel_pause_timer()
+
+        # Schedule Neovim update only if needed
+        if needs_nvim_update:
+            icon = self.icons.get(status_str.lower(), "") if intended_text else ""
+            self._set_display(text=intended_text, icon=icon)
+        self._set_display(**player_fields(player_state))
+
+        # Update internal status *after* potential UI update scheduling
+        self.last_status = current_status
+        self._schedule_drift_check()
+        self.progress.refresh()
 
-            # Schedule Neovim update only if needed
-            if needs_nvim_update:
-                self.nvim.async_call(self._update_nvim_state, intended_text)
+    async def update_status(self):
+        """
+        Fetch the full status from Spotify (async), store it and schedule the
+        Neovim update (main thread).
+        """
+        from dbus_fast.errors import DBusError
+
+        from .interface import PlayerNotRunning
+        from .supervisor import PlayerUnavailable
+
+        logger.debug("Attempting to update Spotify status...")
+
+        try:
+            async with asyncio.timeout(5):
+                with tracer.span("fetch", "dbus"):
+                    spotify = await self._ensure_connected()
+                    player_state = await spotify.get_snapshot()
 
-            # Update internal status *after* potential UI update scheduling
-            self.last_status = current_status
+            self.store.replace(player_state)
+            keep = self.predictions.reconcile_state(
+                player_state, settle=not self.commands.busy
+            )
+            if keep:
+                self.store.apply_prediction(keep)
+                player_state = self.store.state or player_state
+            with tracer.span("render"):
+                self._render_state(player_state)
 
         except asyncio.TimeoutError:
             logger.warning("Timeout waiting for Spotify D-Bus response.")
-            self.nvim.async_call(self._update_nvim_state, "[Spotify Timeout]")
+            self.store.clear()
+            self._set_display(text="[Spotify Timeout]", icon="", **player_fields(None))
             self.last_status = None
             self.last_formatted_text = "[Spotify Timeout]"  # Update cache
             self._cancel_pause_timer()
-        except DBusError as e:
+            self.progress.refresh()
+        except (DBusError, PlayerUnavailable) as e:
             # Log specific error but clear the display generally
-            logger.error(
-                f"D-Bus error updating status: {e}. Is {self.spotify_service} running?"
-            )
+            if isinstance(e, (PlayerNotRunning, PlayerUnavailable)):
+                # Expected while the player is closed; the supervisor reattaches
+                logger.debug("Player unavailable: %s", e)
+            else:
+                logger.error(
+                    f"D-Bus error updating status: {e}. Is {self.spotify_service} running?"
+                )
+            self.store.clear()
             # Clear only if not already cleared/errored to avoid spam
             if self.last_formatted_text != "":
-                self.nvim.async_call(self._update_nvim_state, "")  # Clear display
+                self._set_display(text="", icon="")  # Clear display
+            self._set_display(**player_fields(None))
             self.last_status = None  # Reset status
             self.last_formatted_text = ""  # Reset cache
             self._cancel_pause_timer()
+            self.progress.refresh()
         except Exception:
             logger.exception("Unexpected error updating Spotify status:")
+            self.store.clear()
             error_text = "[Spotify Error]"
             if self.last_formatted_text != error_text:  # Avoid spam
-                self.nvim.async_call(self._update_nvim_state, error_text)
+                self._set_display(text=error_text, icon="")
+            self._set_display(**player_fields(None))
             self.last_status = None
             self.last_formatted_text = error_text  # Update cache
             self._cancel_pause_timer()
+            self.progress.refresh()
 
     # --- Cleanup ---
     @pynvim.shutdown_hook
@@ -390,22 +820,39 @@ class SpotifyNvimPlugin:
         """Cleanup resources on Neovim exit."""
         logger.info("Running cleanup hook...")
         self._cancel_pause_timer()
+        self._cancel_drift_check()
+        self.progress.cancel()
+        logger.info(f"Refresh scheduler stats: {self.refresh.stats()}")
+        logger.info(f"Progress scheduler stats: {self.progress.stats()}")
+        logger.info(f"Command queue stats: {self.commands.stats()}")
+        logger.info(f"Prediction stats: {self.predictions.stats()}")
+        logger.info(f"Perceived latency: {self.latency.stats()}")
+        logger.info(f"Signal stats: {self.spotify.signal_stats()}")
+        logger.info(f"Call stats: {self.spotify.call_stats()}")
+        logger.info(f"Neovim update stats: {self.metrics.stats()}")
+        logger.info(f"Task stats: {self.runner.stats()}")
+        if self.runner.lag is not None:
+            logger.info(f"Event loop lag: {self.runner.lag.stats()}")
 
         # Disconnect the bus. This should implicitly handle signal listener cleanup.
         # Run this in the runner's thread if possible.
         async def disconnect_bus():
-            if self.monitor_bus and self.monitor_bus.connected:
-                logger.info("Disconnecting monitoring bus...")
+            if self.players is not None:
+                logger.info(f"Player registry stats: {self.players.stats()}")
+            if self.supervisor is not None:
+                logger.info(f"Connection supervisor stats: {self.supervisor.stats()}")
+                self.supervisor.stop()
+            if self.spotify.connected:
+                logger.info("Disconnecting shared Spotify bus...")
                 try:
-                    self.monitor_bus.disconnect()
-                    logger.info("Monitoring bus disconnected.")
+                    await self.spotify.disconnect()
+                    logger.info("Shared Spotify bus disconnected.")
                 except Exception as e:
-                    logger.error(f"Error disconnecting monitor bus: {e}")
+                    logger.error(f"Error disconnecting Spotify bus: {e}")
             else:
-                logger.info("Monitor bus already disconnected or never connected.")
-            self.monitor_bus = None
-            self.spotify_proxy = None
-            self.spotify_props_interface = None
+                logger.info("Spotify bus already disconnected or never connected.")
+            self.refresh.cancel()
+            self.commands.cancel()
 
         # Only run cleanup if runner/loop is likely still available
         if self.runner and self.runner._loop and self.runner._loop.is_running():
@@ -429,108 +876,241 @@ class SpotifyNvimPlugin:
         logger.info("Shutting down AsyncRunner...")
         if self.runner:  # Check runner exists
             self.runner.shutdown()
+        logger.info(f"Logging stats: {self.logging.stats()}")
         logger.info("Cleanup complete.")
+        self.logging.stop()
 
-    # --- Commands (remain the same) ---
+    # --- Commands ---
     @pynvim.command("SpotifyToggle", nargs=0, sync=False)
     def toggle_playback_command(self):
         logger.info("Received SpotifyToggle command.")
+        self._queue_command(PlayerCommand.TOGGLE)
 
-        async def _toggle():
-            try:
-                async with asyncio.timeout(3):  # Short timeout for commands
-                    async with Spotify(service=self.spotify_service) as spotify:
-                        await spotify.toggle_playback()
-                # Schedule update *after* command finishes
-                if self.runner._loop and self.runner._loop.is_running():
-                    self.runner.get_loop().create_task(self.update_status())
-            except asyncio.TimeoutError:
-                logger.warning("Timeout executing toggle playback command.")
-                self.nvim.async_call(
-                    self.nvim.err_write, "[SpotifyNvim] Timeout toggling playback.\n"
-                )
-            except Exception as e:
-                logger.error(f"Error toggling playback: {e}")
-                self.nvim.async_call(self.nvim.err_write, f"[SpotifyNvim] Error: {e}\n")
-
-        # Schedule the command action using call_soon -> create_task
-        if self.runner and self.runner._loop and self.runner._loop.is_running():
-            self.runner.call_soon(lambda: asyncio.create_task(_toggle()))
-        else:
-            logger.error("Cannot toggle playback: AsyncRunner not ready.")
-            self.nvim.async_call(
-                self.nvim.err_write,
-                "[SpotifyNvim] Error: Async runner not available.\n",
-            )
+    @pynvim.command("SpotifyShuffle", nargs=0, sync=False)
+    def toggle_shuffle_command(self):
+        logger.info("Received SpotifyShuffle command.")
+        self._queue_command(PlayerCommand.SHUFFLE)
 
     @pynvim.command("SpotifyNext", nargs=0, sync=False)
     def next_track_command(self):
         logger.info("Received SpotifyNext command.")
-
-        async def _next():
-            try:
-                async with asyncio.timeout(3):
-                    async with Spotify(service=self.spotify_service) as spotify:
-                        await spotify.next_track()
-                if self.runner._loop and self.runner._loop.is_running():
-                    self.runner.get_loop().create_task(self.update_status())
-            except asyncio.TimeoutError:
-                logger.warning("Timeout executing next track command.")
-                self.nvim.async_call(
-                    self.nvim.err_write, "[SpotifyNvim] Timeout skipping track.\n"
-                )
-            except Exception as e:
-                logger.error(f"Error skipping to next track: {e}")
-                self.nvim.async_call(self.nvim.err_write, f"[SpotifyNvim] Error: {e}\n")
-
-        if self.runner and self.runner._loop and self.runner._loop.is_running():
-            self.runner.call_soon(lambda: asyncio.create_task(_next()))
-        else:
-            logger.error("Cannot skip next: AsyncRunner not ready.")
-            self.nvim.async_call(
-                self.nvim.err_write,
-                "[SpotifyNvim] Error: Async runner not available.\n",
-            )
+        self._queue_command(PlayerCommand.NEXT)
 
     @pynvim.command("SpotifyPrev", nargs=0, sync=False)
     def previous_track_command(self):
         logger.info("Received SpotifyPrev command.")
+        self._queue_command(PlayerCommand.PREVIOUS)
 
-        async def _prev():
-            try:
-                async with asyncio.timeout(3):
-                    async with Spotify(service=self.spotify_service) as spotify:
-                        await spotify.previous_track()
-                if self.runner._loop and self.runner._loop.is_running():
-                    self.runner.get_loop().create_task(self.update_status())
-            except asyncio.TimeoutError:
-                logger.warning("Timeout executing previous track command.")
-                self.nvim.async_call(
-                    self.nvim.err_write, "[SpotifyNvim] Timeout skipping track.\n"
-                )
-            except Exception as e:
-                logger.error(f"Error skipping to previous track: {e}")
-                self.nvim.async_call(self.nvim.err_write, f"[SpotifyNvim] Error: {e}\n")
+    @pynvim.command("SpotifySeek", nargs=1, sync=False)
+    def seek_command(self, args: list[str]):
+        """Seek by ±seconds, or to an absolute position in seconds or m:ss."""
+        logger.info("Received SpotifySeek command: %s", args)
+        self._queue_adjustment(PlayerCommand.SEEK, args[0], 1_000_000)
 
-        if self.runner and self.runner._loop and self.runner._loop.is_running():
-            self.runner.call_soon(lambda: asyncio.create_task(_prev()))
+    @pynvim.command("SpotifyVolume", nargs=1, sync=False)
+    def volume_command(self, args: list[str]):
+        """Change the volume by ±percent, or set it to an absolute percentage."""
+        logger.info("Received SpotifyVolume command: %s", args)
+        self._queue_adjustment(PlayerCommand.VOLUME, args[0], 0.01)
+
+    def _queue_adjustment(self, command: PlayerCommand, arg: str, unit: float):
+        """Queue a seek or volume change, its argument scaled by `unit`."""
+        try:
+            value, relative = parse_adjustment(arg)
+        except ValueError:
+            self.nvim.err_write(f"[SpotifyNvim] Invalid {command} argument: {arg}\n")
+            return
+        self._queue_command(command, value * unit, relative)
+
+    def _queue_command(
+        self, command: PlayerCommand, value: float = 0, relative: bool = True
+    ):
+        """Queue a player command for whichever player is active right now."""
+        self.latency.mark(command)
+        update = tracer.begin_update(str(command))
+
+        async def _push():
+            nonlocal value, relative
+            if update is not None:
+                self._trace_updates.append(update)
+            state = self.store.state
+            if command == PlayerCommand.VOLUME and relative and state is not None:
+                # Resolve against the volume shown, which includes earlier presses
+                value, relative = state.volume + value, False
+            self.commands.push(command, str(self.spotify.service), value, relative)
+            self._predict(command, value, relative)
+
+        self._submit_command(str(command), _push)
+
+    def _predict(self, command: PlayerCommand, value: float, relative: bool):
+        """Show the expected effect of a press right away, ahead of the player."""
+        state = self.store.state
+        if state is None:
+            return
+        if command == PlayerCommand.SEEK:
+            # Seeked (or the next drift check) corrects the clock if this is off
+            position = state.current_position + value if relative else value
+            self.store.seeked(max(0, int(position)))
+            self.progress.refresh()
+        elif self.predictions.predict(
+            predicted_changes(command, state, value, relative)
+        ):
+            assert self.store.state is not None
+            self._render_state(self.store.state)
+
+    def _on_predictions_rolled_back(self):
+        """The player never confirmed a prediction: show the old state, then ask."""
+        if self.store.state is not None:
+            self._render_state(self.store.state)
+        self.refresh.request(fetch=True)
+
+    def _on_command_error(self, entry: QueuedCommand, error: Exception):
+        self.predictions.rollback()
+        if isinstance(error, TimeoutError):
+            logger.warning(f"Timeout running {entry}.")
+            message = f"[SpotifyNvim] Timeout running {entry.kind} command.\n"
         else:
-            logger.error("Cannot skip previous: AsyncRunner not ready.")
-            self.nvim.async_call(
-                self.nvim.err_write,
-                "[SpotifyNvim] Error: Async runner not available.\n",
-            )
+            logger.error(f"Error running {entry}: {error}")
+            message = f"[SpotifyNvim] Error: {error}\n"
+        self.nvim.async_call(self.nvim.err_write, message)
 
     @pynvim.command("SpotifyUpdate", nargs=0, sync=False)
     def force_update_command(self):
         """Manually trigger a status update."""
         logger.info("Received SpotifyUpdate command.")
-        if self.runner and self.runner._loop and self.runner._loop.is_running():
-            # Schedule update_status directly
-            self.runner.call_soon(lambda: asyncio.create_task(self.update_status()))
+
+        async def _update():
+            # Route through the scheduler so it coalesces with pending refreshes
+            self.refresh.request(fetch=True)
+
+        self._submit_command("update", _update)
+
+    @pynvim.command("SpotifyStats", nargs=0, sync=True)
+    def stats_command(self):
+        """Show call latencies and the counters of every plugin component."""
+        self.nvim.out_write("\n".join(format_stats(self.collect_stats())) + "\n")
+
+    @pynvim.command("SpotifyTrace", nargs="*", sync=True)
+    def trace_command(self, args: list[str]):
+        """
+        Trace updates from signal to redraw: `start`, `stop`, `clear`, or
+        `dump [path]` to write Chrome trace JSON for chrome://tracing or Perfetto.
+        """
+        action = args[0] if args else "dump"
+        if action == "start":
+            tracer.start()
+            self.nvim.out_write("[SpotifyNvim] Tracing started.\n")
+        elif action == "stop":
+            tracer.stop()
+            self.nvim.out_write("[SpotifyNvim] Tracing stopped.\n")
+        elif action == "clear":
+            tracer.clear()
+            self.nvim.exec_lua(_TAKE_TRACE_EVENTS_LUA)
+        elif action == "dump":
+            path = args[1] if len(args) > 1 else DEFAULT_TRACE_FILE
+            tracer.add_events(self.nvim.exec_lua(_TAKE_TRACE_EVENTS_LUA) or [], "lua")
+            try:
+                count = tracer.dump(path)
+            except OSError as e:
+                self.nvim.err_write(f"[SpotifyNvim] Could not write trace: {e}\n")
+                return
+            self.nvim.out_write(
+                f"[SpotifyNvim] Wrote {count} trace events to {path}.\n"
+            )
         else:
-            logger.error("Cannot force update: AsyncRunner not ready.")
-            self.nvim.async_call(
-                self.nvim.err_write,
-                "[SpotifyNvim] Error: Async runner not available.\n",
+            self.nvim.err_write(
+                f"[SpotifyNvim] Unknown trace action '{action}'; "
+                "expected start, stop, clear or dump [path].\n"
             )
+
+    @pynvim.command("SpotifyLoopLag", nargs="?", sync=True)
+    def loop_lag_command(self, args: list[str]):
+        """
+        Sample how late the event loop runs scheduled work: `start`, `stop`, or
+        no argument to show the samples so far.
+        """
+        lag = self.runner.lag
+        if lag is None:
+            self.nvim.err_write("[SpotifyNvim] The event loop is not running.\n")
+            return
+        action = args[0] if args else "show"
+        if action == "start":
+            self.runner.call_soon(lag.start)
+            self.nvim.out_write("[SpotifyNvim] Loop lag sampling started.\n")
+        elif action == "stop":
+            self.runner.call_soon(lag.stop)
+            self.nvim.out_write("[SpotifyNvim] Loop lag sampling stopped.\n")
+        elif action == "show":
+            self.nvim.out_write("\n".join(format_stats(lag.stats())) + "\n")
+        else:
+            self.nvim.err_write(
+                f"[SpotifyNvim] Unknown loop lag action '{action}'; "
+                "expected start or stop.\n"
+            )
+
+    @pynvim.function("SpotifyStats", sync=True)
+    def stats_function(self, args: list[Any]) -> dict[str, Any]:
+        """The stats shown by :SpotifyStats, as a nested table."""
+        return self.collect_stats()
+
+    def collect_stats(self) -> dict[str, Any]:
+        """Gather the stats of every component; safe to call from any thread."""
+        from .snapshot import TrackSnapshot
+
+        stats: dict[str, Any] = {
+            "calls": self.spotify.call_stats(),
+            "nvim": self.metrics.stats(),
+            "signals": self.spotify.signal_stats(),
+            "refresh": self.refresh.stats(),
+            "progress": self.progress.stats(),
+            "clock": self.store.clock.stats(),
+            "commands": self.commands.stats(),
+            "predictions": self.predictions.stats(),
+            "latency": self.latency.stats(),
+            "introspection": self.introspection_cache.stats(),
+            "metadata_cache": TrackSnapshot.cache.stats(),
+            "tasks": self.runner.stats(),
+            "tracing": tracer.stats(),
+            "logging": self.logging.stats(),
+        }
+        if self.runner.lag is not None:
+            stats["loop_lag"] = self.runner.lag.stats()
+        if self.players is not None:
+            stats["registry"] = self.players.stats()
+        if self.supervisor is not None:
+            stats["supervisor"] = self.supervisor.stats()
+        return stats
+
+    @pynvim.function("SpotifyStartupTimes", sync=True)
+    def startup_times_function(self, args: list[Any]) -> dict[str, float]:
+        """Milliseconds from plugin construction to each startup milestone."""
+        return dict(self.startup_times)
+
+    @pynvim.function("SpotifyCommandQueue", sync=True)
+    def command_queue_function(self, args: list[Any]) -> dict[str, int]:
+        """Depth of the command queue and how many presses were merged into it."""
+        return self.commands.stats()
+
+    @pynvim.function("SpotifyTasks", sync=True)
+    def tasks_function(self, args: list[Any]) -> dict[str, dict[str, int | None]]:
+        """Pending, running and finished background tasks per task group."""
+        return self.runner.stats()
+
+    @pynvim.function("SpotifyLoopLag", sync=True)
+    def loop_lag_function(self, args: list[Any]) -> dict[str, Any]:
+        """Which event loop runs the plugin and how late it runs scheduled work."""
+        return self.runner.lag.stats() if self.runner.lag is not None else {}
+
+    @pynvim.function("SpotifyLatency", sync=True)
+    def latency_function(self, args: list[Any]) -> dict[str, Any]:
+        """Key press to statusline latency and how predictions fared."""
+        return {
+            "latency": self.latency.stats(),
+            "predictions": self.predictions.stats(),
+        }
+
+    @pynvim.function("SpotifyFocus", sync=False)
+    def focus_function(self, args: list[Any]):
+        """Called from FocusGained/FocusLost autocmds with whether Neovim has focus."""
+        focused = bool(args[0]) if args else True
+        self.runner.call_soon(self.progress.set_focused, focused)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from typing import final
+
+from .clock import PlaybackClock
+
+logger = logging.getLogger(__name__)
+
+BAR_FILLED = "━"
+BAR_EMPTY = "─"
+
+# Re-arming a boundary wakeup this much late makes sure the clock has crossed
+# into the next displayed second when the timer fires.
+_BOUNDARY_SLACK = 0.005
+
+
+def format_time(microseconds: int) -> str:
+    """Format a duration in microseconds as `m:ss`, or `h:mm:ss` past an hour."""
+    seconds = microseconds // 1_000_000
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours > 0:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    else:
+        return f"{minutes}:{seconds:02d}"
+
+
+def format_progress(position: int, length: int, width: int = 10) -> str:
+    """
+    Render `elapsed / total` followed by a bar `width` cells wide. Without a
+    known length only the elapsed time is shown.
+    """
+    elapsed = format_time(position)
+    if length <= 0:
+        return elapsed
+    filled = min(width, position * width // length) if width > 0 else 0
+    bar = BAR_FILLED * filled + BAR_EMPTY * (width - filled)
+    text = f"{elapsed} / {format_time(length)}"
+    return f"{text} {bar}" if bar else text
+
+
+@final
+class ProgressScheduler:
+    """
+    Re-renders the progress component each time the playback clock crosses a
+    displayed second, and not otherwise.
+
+    A single timer is armed for the next boundary only while the clock is
+    advancing and Neovim has focus, so a paused or stopped player and an
+    unfocused editor cost no wakeups at all. Must be used from the thread
+    running `loop`.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        clock: PlaybackClock,
+        render: Callable[[], None],
+    ):
+        """
+        Args:
+            loop: The event loop wakeups are scheduled on.
+            clock: The clock whose displayed seconds drive the wakeups.
+            render: Called on every wakeup and refresh; it is expected to push
+                    the rendered text only when it changed.
+        """
+        self._loop = loop
+        self._clock = clock
+        self._render = render
+        self._timer: asyncio.TimerHandle | None = None
+        self.focused = True
+
+        self.wakeups = 0
+        self.renders = 0
+
+    def refresh(self) -> None:
+        """Render now and re-arm for the next boundary, e.g. after a state change."""
+        self._cancel_timer()
+        self._render_now()
+        self._arm()
+
+    def set_focused(self, focused: bool) -> None:
+        """Suspend on FocusLost; catch up and resume on FocusGained."""
+        if focused == self.focused:
+            return
+        self.focused = focused
+        logger.debug("Progress rendering %s.", "resumed" if focused else "suspended")
+        if focused:
+            self.refresh()
+        else:
+            self._cancel_timer()
+
+    def cancel(self) -> None:
+        self._cancel_timer()
+
+    def _arm(self) -> None:
+        if not self.focused:
+            return
+        delay = self._clock.seconds_until_next_second()
+        if delay is None:
+            return
+        self._timer = self._loop.call_later(delay + _BOUNDARY_SLACK, self._on_boundary)
+
+    def _on_boundary(self) -> None:
+        self._timer = None
+        self.wakeups += 1
+        self._render_now()
+        self._arm()
+
+    def _render_now(self) -> None:
+        self.renders += 1
+        try:
+            self._render()
+        except Exception:
+            logger.exception("Unexpected error rendering progress:")
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self) -> dict[str, int | bool]:
+        return {
+            "wakeups": self.wakeups,
+            "renders": self.renders,
+            "armed": self._timer is not None,
+            "focused": self.focused,
+        }
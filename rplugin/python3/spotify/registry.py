@@ -0,0 +1,371 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
+from typing import Any
+from typing import final
+
+from dbus_fast import ErrorType
+from dbus_fast import Message
+from dbus_fast import MessageType
+from dbus_fast.aio import MessageBus
+from dbus_fast.errors import DBusError
+
+from .mpris import BUS_NAME_NAMESPACE
+from .mpris import OBJECT_PATH
+from .mpris import PLAYER_INTERFACE
+from .snapshot import PlayerSnapshot
+from .store import PlayerStateStore
+from .subscriptions import DBUS_NAME
+from .subscriptions import DBUS_PATH
+from .subscriptions import PROPERTIES
+from .subscriptions import NameOwnerChangedHandler
+from .subscriptions import PropertiesChangedHandler
+from .subscriptions import SeekedHandler
+
+logger = logging.getLogger(__name__)
+
+
+@final
+class TrackedPlayer:
+    """One MPRIS player on the bus and the state its signals have built up."""
+
+    def __init__(self, name: str, owner: str, seq: int):
+        self.name = name
+        self.owner = owner
+        # Discovery order, the tie-breaker between players that never played
+        self.seq = seq
+        self.store = PlayerStateStore()
+        # time.monotonic() of the last time the player was seen playing
+        self.last_playing = 0.0
+
+    @property
+    def playing(self) -> bool:
+        state = self.store.state
+        return state is not None and state.is_playing()
+
+    def mark_playing(self) -> None:
+        if self.playing:
+            self.last_playing = time.monotonic()
+
+
+ActivePolicy = Callable[[Iterable[TrackedPlayer]], TrackedPlayer | None]
+
+
+def most_recently_playing(players: Iterable[TrackedPlayer]) -> TrackedPlayer | None:
+    """
+    The player that started playing last; while none plays, the one that played
+    last, and failing that the first one discovered.
+    """
+    return max(
+        players,
+        key=lambda player: (player.playing, player.last_playing, -player.seq),
+        default=None,
+    )
+
+
+@final
+class PlayerRegistry:
+    """
+    Every MPRIS player on the bus, tracked from signals over one connection.
+
+    Player names are listed once with ListNames and kept current from
+    NameOwnerChanged; each player's state is seeded with one GetAll and then
+    merged from its PropertiesChanged and Seeked signals. A policy picks the
+    active player from that in-memory state.
+
+    It stands in for SignalSubscriptions: Player signals are only forwarded
+    from the active player, and a switch reaches the NameOwnerChanged handlers
+    as (new player's name, old owner, new owner), so a client retargets
+    without touching the bus connection.
+    """
+
+    def __init__(
+        self,
+        names: Iterable[str] | None = None,
+        policy: ActivePolicy = most_recently_playing,
+    ):
+        """
+        Args:
+            names: Players to track by the name after the MPRIS namespace, e.g.
+                   "spotify" or "spotifyd" (instance suffixes are ignored).
+                   None tracks every player.
+            policy: Picks the active player among the tracked ones.
+        """
+        self.names = frozenset(names) if names is not None else None
+        self.policy = policy
+        self.players: dict[str, TrackedPlayer] = {}
+        self._names_by_owner: dict[str, str] = {}
+        self._active: TrackedPlayer | None = None
+        # In-flight GetAll per player name
+        self._fetches: dict[str, asyncio.Task[None]] = {}
+        self._discovering = False
+        self._bus: MessageBus | None = None
+        self._seq = itertools.count()
+        self._properties_changed_handlers: list[PropertiesChangedHandler] = []
+        self._seeked_handlers: list[SeekedHandler] = []
+        self._name_owner_changed_handlers: list[NameOwnerChangedHandler] = []
+
+        self.received = 0
+        self.acted = 0
+        self.switches = 0
+
+    @property
+    def active(self) -> TrackedPlayer | None:
+        return self._active
+
+    def active_state(self) -> PlayerSnapshot | None:
+        """The active player's tracked state, detached for use by another store."""
+        if self._active is None:
+            return None
+        return self._active.store.detached()
+
+    def tracks(self, name: str) -> bool:
+        """Whether `name` is an MPRIS bus name this registry follows."""
+        if not name.startswith(BUS_NAME_NAMESPACE + "."):
+            return False
+        if self.names is None:
+            return True
+        player = name[len(BUS_NAME_NAMESPACE) + 1 :].split(".", 1)[0]
+        return player in self.names
+
+    def match_rules(self) -> list[str]:
+        return [
+            f"type='signal',path='{OBJECT_PATH}',interface='{PROPERTIES}',"
+            f"member='PropertiesChanged',arg0='{PLAYER_INTERFACE}'",
+            f"type='signal',path='{OBJECT_PATH}',interface='{PLAYER_INTERFACE}',"
+            "member='Seeked'",
+            f"type='signal',sender='{DBUS_NAME}',path='{DBUS_PATH}',"
+            f"interface='{DBUS_NAME}',member='NameOwnerChanged',"
+            f"arg0namespace='{BUS_NAME_NAMESPACE}'",
+        ]
+
+    async def install(self, bus: MessageBus) -> None:
+        """Subscribe on `bus` and discover the running players, once per bus."""
+        if self._bus is bus:
+            return
+        for rule in self.match_rules():
+            await _bus_call(bus, "AddMatch", "s", rule)
+        bus.add_message_handler(self._on_message)
+        self._bus = bus
+
+        # The client reads the initial pick from `active`; nothing to announce
+        self._discovering = True
+        try:
+            names: list[str] = await _bus_call(bus, "ListNames")
+            found = [name for name in names if self.tracks(name)]
+            owners = await asyncio.gather(
+                *(_bus_call(bus, "GetNameOwner", "s", name) for name in found),
+                return_exceptions=True,
+            )
+            for name, owner in zip(found, owners, strict=True):
+                if isinstance(owner, str) and name not in self.players:
+                    self._add(name, owner)
+            await asyncio.gather(
+                *(self._fetch(player) for player in list(self.players.values())),
+                return_exceptions=True,
+            )
+        finally:
+            self._discovering = False
+        self._active = self.policy(self.players.values())
+        logger.info(
+            "Tracking MPRIS players %s; active: %s",
+            sorted(self.players),
+            self._active and self._active.name,
+        )
+
+    async def remove(self) -> None:
+        """Undo install() on a bus that stays connected."""
+        bus = self._bus
+        self.reset()
+        if bus is None or not bus.connected:
+            return
+        bus.remove_message_handler(self._on_message)
+        for rule in self.match_rules():
+            await _bus_call(bus, "RemoveMatch", "s", rule)
+
+    def reset(self) -> None:
+        """Forget the bus and every player on it after it disconnected."""
+        self._bus = None
+        for fetch in self._fetches.values():
+            fetch.cancel()
+        self._fetches.clear()
+        self.players.clear()
+        self._names_by_owner.clear()
+        self._active = None
+
+    def add_properties_changed_handler(self, handler: PropertiesChangedHandler) -> None:
+        self._properties_changed_handlers.append(handler)
+
+    def add_seeked_handler(self, handler: SeekedHandler) -> None:
+        self._seeked_handlers.append(handler)
+
+    def add_name_owner_changed_handler(self, handler: NameOwnerChangedHandler) -> None:
+        self._name_owner_changed_handlers.append(handler)
+
+    def _add(self, name: str, owner: str) -> TrackedPlayer:
+        player = TrackedPlayer(name, owner, next(self._seq))
+        self.players[name] = player
+        self._names_by_owner[owner] = name
+        return player
+
+    def _drop(self, name: str) -> None:
+        player = self.players.pop(name, None)
+        if player is None:
+            return
+        self._names_by_owner.pop(player.owner, None)
+        fetch = self._fetches.pop(name, None)
+        if fetch is not None:
+            fetch.cancel()
+
+    def _fetch(self, player: TrackedPlayer) -> asyncio.Task[None]:
+        """Seed or resync one player's state with GetAll, one request at a time."""
+        fetch = self._fetches.get(player.name)
+        if fetch is None or fetch.done():
+            fetch = asyncio.ensure_future(self._get_all(player))
+            self._fetches[player.name] = fetch
+        return fetch
+
+    async def _get_all(self, player: TrackedPlayer) -> None:
+        assert self._bus is not None
+        try:
+            properties = await _bus_call(
+                self._bus,
+                "GetAll",
+                "s",
+                PLAYER_INTERFACE,
+                destination=player.owner,
+                path=OBJECT_PATH,
+                interface=PROPERTIES,
+            )
+        except DBusError as e:
+            logger.warning("Could not read the state of %s: %s", player.name, e)
+            return
+        try:
+            player.store.replace(PlayerSnapshot.from_dbus_dict(properties))
+        except ValueError as e:
+            logger.warning("Could not read the state of %s: %s", player.name, e)
+            return
+        player.mark_playing()
+        if self.players.get(player.name) is player:
+            self._elect()
+
+    def _elect(self) -> None:
+        """Re-run the policy and announce the active player if it changed."""
+        if self._discovering:
+            return
+        active = self.policy(self.players.values())
+        previous = self._active
+        if active is previous:
+            return
+        self._active = active
+        self.switches += 1
+        logger.info(
+            "Active player: %s -> %s",
+            previous and previous.name,
+            active and active.name,
+        )
+        if active is not None:
+            name, new_owner = active.name, active.owner
+        else:
+            assert previous is not None
+            name, new_owner = previous.name, ""
+        old_owner = previous.owner if previous is not None else ""
+        for handler in self._name_owner_changed_handlers:
+            handler(name, old_owner, new_owner)
+
+    def _on_message(self, msg: Message) -> None:
+        if msg.message_type != MessageType.SIGNAL:
+            return
+        self.received += 1
+        body: list[Any] = msg.body
+        if msg.member == "NameOwnerChanged":
+            if msg.sender != DBUS_NAME or not self.tracks(body[0]):
+                return
+            self.acted += 1
+            self._on_name_owner_changed(body[0], body[1], body[2])
+            return
+
+        name = self._names_by_owner.get(msg.sender or "")
+        player = self.players.get(name) if name is not None else None
+        if player is None or msg.path != OBJECT_PATH:
+            return
+        if msg.member == "PropertiesChanged":
+            if body[0] != PLAYER_INTERFACE:
+                return
+            self.acted += 1
+            active = self._active
+            self._on_properties_changed(player, body[1], body[2])
+            # A delta that switched the active player is already in the state the
+            # switch hands over; forwarded, it would merge into the previous one
+            if player is active and player is self._active:
+                for handler in self._properties_changed_handlers:
+                    handler(body[0], body[1], body[2])
+        elif msg.member == "Seeked":
+            if msg.interface != PLAYER_INTERFACE:
+                return
+            self.acted += 1
+            player.store.seeked(body[0])
+            if player is self._active:
+                for handler in self._seeked_handlers:
+                    handler(body[0])
+
+    def _on_name_owner_changed(self, name: str, old_owner: str, new_owner: str) -> None:
+        if old_owner:
+            logger.info("MPRIS player %s vanished.", name)
+            self._drop(name)
+        if new_owner:
+            logger.info("MPRIS player %s appeared.", name)
+            self._fetch(self._add(name, new_owner))
+        self._elect()
+
+    def _on_properties_changed(
+        self,
+        player: TrackedPlayer,
+        changed_properties: dict[str, Any],
+        invalidated_properties: list[str],
+    ) -> None:
+        was_playing = player.playing
+        if not player.store.apply_changes(changed_properties, invalidated_properties):
+            self._fetch(player)
+            return
+        if player.playing != was_playing:
+            player.mark_playing()
+            self._elect()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "received": self.received,
+            "acted": self.acted,
+            "players": len(self.players),
+            "switches": self.switches,
+        }
+
+
+async def _bus_call(
+    bus: MessageBus,
+    member: str,
+    signature: str = "",
+    *body: Any,
+    destination: str = DBUS_NAME,
+    path: str = DBUS_PATH,
+    interface: str = DBUS_NAME,
+) -> Any:
+    reply = await bus.call(
+        Message(
+            destination=destination,
+            path=path,
+            interface=interface,
+            member=member,
+            signature=signature,
+            body=list(body),
+        )
+    )
+    assert reply is not None
+    if reply.message_type == MessageType.ERROR:
+        raise DBusError(reply.error_name or ErrorType.FAILED, *reply.body[:1])
+    return reply.body[0] if reply.body else None
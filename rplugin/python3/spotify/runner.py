@@ -6,25 +6,188 @@ import logging
 import threading
 from collections.abc import Callable
 from collections.abc import Coroutine
+from collections.abc import Hashable
 from concurrent.futures import Future
 from concurrent.futures import TimeoutError
 from typing import Any
+from typing import Protocol
 from typing import TypeVar
 from typing import final
 
+from .lag import LoopLagMonitor
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
+LoopFactory = Callable[[], asyncio.AbstractEventLoop]
+
+
+class Spawn(Protocol):
+    """
+    Runs a background coroutine as a task, usually AsyncRunner.spawn bound to
+    a group, so the task shows up in its stats and is cancelled on shutdown.
+    """
+
+    def __call__(
+        self, coro: Coroutine[Any, Any, None], key: Hashable | None = None
+    ) -> asyncio.Task[None]: ...
+
+
+def _uvloop_loop() -> asyncio.AbstractEventLoop:
+    # Not a dependency: _auto_loop falls back to asyncio's loop without it
+    import uvloop  # pyright: ignore[reportMissingImports]
+
+    return uvloop.new_event_loop()
+
+
+def _auto_loop() -> asyncio.AbstractEventLoop:
+    try:
+        return _uvloop_loop()
+    except ImportError:
+        return asyncio.new_event_loop()
+
+
+LOOP_FACTORIES: dict[str, LoopFactory] = {
+    # uvloop when it is installed, asyncio's own loop otherwise
+    "auto": _auto_loop,
+    "asyncio": asyncio.new_event_loop,
+    "uvloop": _uvloop_loop,
+}
+
+
+def loop_factory(name: str) -> LoopFactory:
+    """The loop factory registered as `name`, or the "auto" one if unknown."""
+    factory = LOOP_FACTORIES.get(name)
+    if factory is None:
+        logger.warning(
+            "Unknown event loop '%s'; expected one of %s.", name, sorted(LOOP_FACTORIES)
+        )
+        return _auto_loop
+    return factory
+
+
+@final
+class _TaskGroup:
+    """Tasks spawned under one group name, optionally capped in how many run at once."""
+
+    def __init__(self, name: str, limit: int | None = None):
+        self.name = name
+        self.limit = limit
+        self._slots = asyncio.Semaphore(limit) if limit else None
+        self.tasks: set[asyncio.Task[Any]] = set()
+        # Keyed tasks; a resubmitted key supersedes the running task
+        self.keyed: dict[Hashable, asyncio.Task[Any]] = {}
+        self.running = 0
+
+        self.spawned = 0
+        self.superseded = 0
+        self.cancelled = 0
+        self.failed = 0
+
+    def set_limit(self, limit: int | None) -> None:
+        """Cap concurrency for tasks spawned from now on; None for no cap."""
+        self.limit = limit
+        self._slots = asyncio.Semaphore(limit) if limit else None
+
+    async def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        slots = self._slots
+        if slots is None:
+            return await self._run(coro)
+        async with slots:
+            return await self._run(coro)
+
+    async def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        self.running += 1
+        try:
+            return await coro
+        finally:
+            self.running -= 1
+
+    def add(
+        self,
+        task: asyncio.Task[Any],
+        coro: Coroutine[Any, Any, Any],
+        key: Hashable | None,
+    ) -> None:
+        if key is not None:
+            previous = self.keyed.get(key)
+            if previous is not None and not previous.done():
+                previous.cancel()
+                self.superseded += 1
+            self.keyed[key] = task
+        self.tasks.add(task)
+        self.spawned += 1
+        task.add_done_callback(lambda task: self._done(task, coro, key))
+
+    def _done(
+        self,
+        task: asyncio.Task[Any],
+        coro: Coroutine[Any, Any, Any],
+        key: Hashable | None,
+    ) -> None:
+        # No-op once awaited; closes a coroutine cancelled before it started
+        coro.close()
+        self.tasks.discard(task)
+        if key is not None and self.keyed.get(key) is task:
+            del self.keyed[key]
+        if task.cancelled():
+            self.cancelled += 1
+        elif (error := task.exception()) is not None:
+            self.failed += 1
+            logger.error(
+                "Task %s in group '%s' failed.",
+                task.get_name(),
+                self.name,
+                exc_info=error,
+            )
+
+    def stats(self) -> dict[str, int | None]:
+        return {
+            "pending": len(self.tasks),
+            "running": self.running,
+            "limit": self.limit,
+            "spawned": self.spawned,
+            "superseded": self.superseded,
+            "cancelled": self.cancelled,
+            "failed": self.failed,
+        }
+
 
 @final
 class AsyncRunner:
-    """Manages a dedicated asyncio event loop running in a background thread."""
+    """
+    Manages a dedicated asyncio event loop running in a background thread.
+
+    Fire-and-forget work goes through spawn(), which keeps a reference to every
+    task in a named group until it finishes. Groups can cap how many of their
+    tasks run at once, and a task spawned with a key cancels the group's
+    earlier task with the same key. shutdown() cancels what is still pending
+    and waits for it to unwind before stopping the loop.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        drain_timeout: float = 2.0,
+        loop_factory: LoopFactory = _auto_loop,
+    ):
+        """
+        Args:
+            drain_timeout: Seconds shutdown() waits for cancelled tasks to finish.
+            loop_factory: Creates the event loop, on the background thread.
+                          Falls back to asyncio's loop if it raises.
+        """
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_factory = loop_factory
+        # Scheduling delay on the loop thread, created with the loop; sampling
+        # is opt-in, started from the loop thread with lag.start()
+        self.lag: LoopLagMonitor | None = None
         self._loop_thread: threading.Thread | None = None
         self._started = threading.Event()  # To signal loop start
+        self.drain_timeout = drain_timeout
+        # Only touched from the loop thread, see spawn()
+        self._groups: dict[str, _TaskGroup] = {}
+        self._closing = False
         self._start_event_loop_thread()
         atexit.register(self.shutdown)
         logger.info("AsyncRunner initialized.")
@@ -33,8 +196,13 @@ class AsyncRunner:
         """Target function for the background event loop thread."""
         try:
             logger.info("Background thread started.")
-            self._loop = asyncio.new_event_loop()
+            try:
+                self._loop = self._loop_factory()
+            except Exception:
+                logger.exception("Loop factory failed; using asyncio's event loop.")
+                self._loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self._loop)
+            self.lag = LoopLagMonitor(self._loop)
             self._started.set()  # Signal that the loop is set
             logger.info("Running event loop: %s", self._loop)
             self._loop.run_forever()
@@ -128,9 +296,119 @@ class AsyncRunner:
             raise RuntimeError("AsyncRunner event loop is not available")
         return self._loop.call_soon_threadsafe(callback, *args)
 
+    def spawn(
+        self,
+        coro: Coroutine[Any, Any, T],
+        group: str = "default",
+        key: Hashable | None = None,
+    ) -> asyncio.Task[T]:
+        """
+        Runs a coroutine as a task tracked in `group`. Must be called from the
+        event loop thread; use spawn_threadsafe() from anywhere else.
+
+        Args:
+            coro: The coroutine object to run.
+            group: Name of the group the task counts against.
+            key: When set, the group's still-running task spawned with the same
+                 key is cancelled in favour of this one.
+
+        Returns:
+            The task, already tracked; awaiting it is optional.
+
+        Raises:
+            RuntimeError: If the event loop is not running or shutting down.
+        """
+        loop = self._loop
+        if loop is None or not loop.is_running() or self._closing:
+            coro.close()
+            raise RuntimeError("AsyncRunner event loop is not available")
+        task_group = self._group(group)
+        name = group if key is None else f"{group}:{key}"
+        task = loop.create_task(task_group.run(coro), name=name)
+        task_group.add(task, coro, key)
+        return task
+
+    def spawn_threadsafe(
+        self,
+        coro: Coroutine[Any, Any, Any],
+        group: str = "default",
+        key: Hashable | None = None,
+    ) -> None:
+        """
+        Schedules spawn() on the event loop thread. This is thread-safe.
+
+        Raises:
+            RuntimeError: If the event loop is not running.
+        """
+
+        def _spawn():
+            try:
+                self.spawn(coro, group, key)
+            except RuntimeError:
+                logger.warning("Dropped task for group '%s': loop is closing.", group)
+
+        try:
+            self.call_soon(_spawn)
+        except RuntimeError:
+            coro.close()
+            raise
+
+    def set_group_limit(self, group: str, limit: int | None) -> None:
+        """
+        Caps how many tasks of `group` run at once; further tasks wait their
+        turn. Applies to tasks spawned afterwards. Call from the loop thread
+        or before any task of the group is spawned.
+        """
+        self._group(group).set_limit(limit)
+
+    def _group(self, name: str) -> _TaskGroup:
+        group = self._groups.get(name)
+        if group is None:
+            group = self._groups[name] = _TaskGroup(name)
+        return group
+
+    def pending(self) -> dict[str, int]:
+        """Number of unfinished tasks per group, running or waiting for a slot."""
+        groups = list(self._groups.items())
+        return {name: len(group.tasks) for name, group in groups}
+
+    def stats(self) -> dict[str, dict[str, int | None]]:
+        return {name: group.stats() for name, group in list(self._groups.items())}
+
+    async def _drain(self) -> None:
+        """Cancel every task on the loop and wait for them to unwind."""
+        self._closing = True
+        if self.lag is not None:
+            self.lag.stop()
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        if not tasks:
+            return
+        logger.info("Cancelling %d pending tasks: %s", len(tasks), self.pending())
+        for task in tasks:
+            task.cancel()
+        _, still_pending = await asyncio.wait(tasks, timeout=self.drain_timeout)
+        if still_pending:
+            logger.warning(
+                "%d tasks did not finish after cancellation: %s",
+                len(still_pending),
+                sorted(task.get_name() for task in still_pending),
+            )
+
     def shutdown(self):
-        """Stops the event loop and waits for the background thread to join."""
+        """
+        Cancels pending tasks, stops the event loop and waits for the
+        background thread to join.
+        """
         logger.info("AsyncRunner shutdown requested.")
+        on_loop_thread = threading.current_thread() is self._loop_thread
+        if self._loop and self._loop.is_running() and not on_loop_thread:
+            logger.info("Draining tasks before stopping the event loop...")
+            drain = asyncio.run_coroutine_threadsafe(self._drain(), self._loop)
+            try:
+                drain.result(timeout=self.drain_timeout + 1)
+            except Exception:
+                logger.exception("Error draining tasks during shutdown.")
         if self._loop and self._loop.is_running():
             logger.info("Stopping event loop via shutdown...")
             # Schedule stop from the current thread
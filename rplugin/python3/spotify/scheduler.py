@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+from typing import final
+
+if TYPE_CHECKING:
+    from .runner import Spawn
+
+logger = logging.getLogger(__name__)
+
+
+@final
+class RefreshScheduler:
+    """
+    Coalesces bursts of refresh requests into a single debounced refresh.
+
+    Every request (re)arms a quiet-window timer and the refresh only runs once
+    the window elapses without further requests. At most one refresh is in
+    flight and at most one is queued behind it; a newer request supersedes the
+    queued one. Must be used from the thread running `loop`.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        spawn: Spawn,
+        refresh: Callable[[bool], Awaitable[None]],
+        quiet_window: float = 0.05,
+    ):
+        """
+        Args:
+            loop: The event loop refreshes are scheduled on.
+            spawn: Runs each refresh as a task, e.g. in an AsyncRunner group.
+            refresh: Coroutine function run for each refresh. Receives True when
+                     at least one coalesced request asked for a full fetch.
+            quiet_window: Seconds without new requests before refreshing.
+        """
+        self._loop = loop
+        self._spawn = spawn
+        self._refresh = refresh
+        self.quiet_window = quiet_window
+        self._timer: asyncio.TimerHandle | None = None
+        self._in_flight: asyncio.Task[None] | None = None
+        self._queued = False
+        self._pending_fetch = False
+
+        self.requests = 0
+        self.absorbed = 0
+        self.superseded = 0
+        self.refreshes = 0
+
+    def request(self, fetch: bool = False) -> None:
+        """Ask for a refresh; bursts within the quiet window collapse into one."""
+        self.requests += 1
+        self._pending_fetch = self._pending_fetch or fetch
+        if self._timer is not None:
+            self._timer.cancel()
+            self.absorbed += 1
+        self._timer = self._loop.call_later(self.quiet_window, self._on_quiet)
+
+    def cancel(self) -> None:
+        """Drop any armed or queued refresh and cancel the one in flight."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._queued = False
+        self._pending_fetch = False
+        if self._in_flight is not None:
+            self._in_flight.cancel()
+
+    def _on_quiet(self) -> None:
+        self._timer = None
+        if self._in_flight is None:
+            self._start()
+            return
+        if self._queued:
+            self.superseded += 1
+        self._queued = True
+
+    def _start(self) -> None:
+        fetch = self._pending_fetch
+        self._pending_fetch = False
+        self._queued = False
+        self.refreshes += 1
+        self._in_flight = self._spawn(self._run(fetch))
+
+    async def _run(self, fetch: bool) -> None:
+        try:
+            await self._refresh(fetch)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Scheduled refresh failed.")
+        finally:
+            self._in_flight = None
+            if self._queued:
+                self._start()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "requests": self.requests,
+            "absorbed": self.absorbed,
+            "superseded": self.superseded,
+            "refreshes": self.refreshes,
+            "in_flight": int(self._in_flight is not None),
+            "queued": int(self._queued),
+        }
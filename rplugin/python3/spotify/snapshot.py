@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+from typing import TYPE_CHECKING
+from typing import Any
+from typing import ClassVar
+
+from dbus_fast.signature import Variant
+
+from .memo import MetadataCache
+from .mpris import PLAYER_PROPERTIES
+from .mpris import LoopStatus
+from .mpris import PlaybackStatus
+
+if TYPE_CHECKING:
+    from .clock import PlaybackClock
+    from .models import PlayerState
+    from .models import TrackMetadata
+
+
+@dataclass(frozen=True, slots=True)
+class TrackSnapshot:
+    """
+    Immutable, unvalidated counterpart of TrackMetadata for the internal
+    signal-to-statusline pipeline. Values from the player are trusted as-is.
+    """
+
+    title: str = "Unknown Title"
+    artist: tuple[str, ...] = ("Unknown Artist",)
+    album: str = "Unknown Album"
+    album_artist: tuple[str, ...] = ("Unknown Artist",)
+    art_url: str | None = None
+    length: int = 0
+    track_id: str = ""
+    url: str | None = None
+    disc_number: int | None = None
+    track_number: int | None = None
+
+    # Assigned below the class; shared by every parse of a metadata payload
+    cache: ClassVar[MetadataCache[TrackSnapshot]]
+
+    @classmethod
+    def from_dbus_dict(cls, metadata: dict[str, Any]) -> TrackSnapshot:
+        """Parse a Metadata payload, reusing the snapshot of an unchanged track."""
+        return cls.cache.get(metadata)
+
+    @classmethod
+    def _parse_dbus_dict(cls, metadata: dict[str, Any]) -> TrackSnapshot:
+        data = {
+            key: value.value if type(value) is Variant else value
+            for key, value in metadata.items()
+        }
+        get = data.get
+        return cls(
+            get("xesam:title", "Unknown Title"),
+            tuple(get("xesam:artist", ("Unknown Artist",))),
+            get("xesam:album", "Unknown Album"),
+            tuple(get("xesam:albumArtist", ("Unknown Artist",))),
+            get("mpris:artUrl") or None,
+            get("mpris:length", 0),
+            get("mpris:trackid", ""),
+            get("xesam:url"),
+            get("xesam:discNumber"),
+            get("xesam:trackNumber"),
+        )
+
+    def to_model(self) -> TrackMetadata:
+        """Validate into the public pydantic model."""
+        from .models import TrackMetadata
+
+        # model_validate, so the art URL is parsed into an HttpUrl
+        return TrackMetadata.model_validate(
+            {
+                "title": self.title,
+                "artist": list(self.artist),
+                "album": self.album,
+                "album_artist": list(self.album_artist),
+                "art_url": self.art_url,
+                "length": self.length,
+                "track_id": self.track_id,
+                "url": self.url,
+                "disc_number": self.disc_number,
+                "track_number": self.track_number,
+            }
+        )
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.length / 1_000_000
+
+    @property
+    def display_title(self) -> str:
+        artists = ", ".join(self.artist)
+        return f"{self.title} by {artists}"
+
+
+TrackSnapshot.cache = MetadataCache(TrackSnapshot._parse_dbus_dict)  # pyright: ignore[reportPrivateUsage]
+
+
+# Not frozen: a PlayerSnapshot is rebuilt on every update and frozen dataclasses
+# pay an object.__setattr__ per field in __init__. Never mutate one in place;
+# derive a new snapshot with with_dbus_changes() instead.
+@dataclass(slots=True)
+class PlayerSnapshot:
+    """
+    Unvalidated counterpart of PlayerState. Built straight from D-Bus payloads
+    without running the pydantic validators; use to_model() when handing state
+    across the public API boundary.
+    """
+
+    playback_status: PlaybackStatus = PlaybackStatus.STOPPED
+    loop_status: LoopStatus = LoopStatus.NONE
+    rate: float = 1.0
+    shuffle: bool = False
+    volume: float = 1.0
+    position: int = 0
+    metadata: TrackSnapshot = field(default_factory=TrackSnapshot)
+    can_control: bool = True
+    can_go_next: bool = True
+    can_go_previous: bool = True
+    can_play: bool = True
+    can_pause: bool = True
+    can_seek: bool = True
+    # Interpolates `position` between fetches; shared by successive snapshots
+    clock: PlaybackClock | None = field(default=None, compare=False, repr=False)
+
+    @classmethod
+    def from_dbus_dict(cls, properties: dict[str, Any]) -> PlayerSnapshot:
+        return cls(**_process_dbus_dict(properties))
+
+    def with_dbus_changes(self, changed_properties: dict[str, Any]) -> PlayerSnapshot:
+        """Return a new snapshot with a PropertiesChanged payload merged in."""
+        return replace(self, **_process_dbus_dict(changed_properties))
+
+    def to_model(self) -> PlayerState:
+        """Validate into the public pydantic model."""
+        from .models import PlayerState
+
+        state = PlayerState(
+            playback_status=self.playback_status,
+            loop_status=self.loop_status,
+            rate=self.rate,
+            shuffle=self.shuffle,
+            volume=self.volume,
+            position=self.position,
+            metadata=self.metadata.to_model(),
+            can_control=self.can_control,
+            can_go_next=self.can_go_next,
+            can_go_previous=self.can_go_previous,
+            can_play=self.can_play,
+            can_pause=self.can_pause,
+            can_seek=self.can_seek,
+        )
+        if self.clock is not None:
+            state.attach_clock(self.clock)
+        return state
+
+    def is_playing(self) -> bool:
+        return self.playback_status == PlaybackStatus.PLAYING
+
+    @property
+    def current_position(self) -> int:
+        # in microseconds
+        if self.clock is not None:
+            return self.clock.position()
+        return self.position
+
+    @property
+    def progress_percentage(self) -> float:
+        if self.metadata.length <= 0:
+            return 0.0
+        return min(100.0, (self.current_position / self.metadata.length) * 100.0)
+
+    @property
+    def time_remaining(self) -> int:
+        # in microseconds
+        if self.metadata.length <= 0:
+            return 0
+        return max(0, self.metadata.length - self.current_position)
+
+
+_PLAYBACK_STATUSES = {status.value: status for status in PlaybackStatus}
+_LOOP_STATUSES = {status.value: status for status in LoopStatus}
+
+
+def _enum_value[E](members: dict[str, E], key: str, value: Any) -> E:
+    """Look up an MPRIS enum value; ValueError for one the spec doesn't define."""
+    try:
+        return members[value]
+    except (KeyError, TypeError):
+        raise ValueError(f"Unknown {key} {value!r}") from None
+
+
+def _process_dbus_dict(properties: dict[str, Any]) -> dict[str, Any]:
+    processed_data: dict[str, Any] = {}
+    for key, value in properties.items():
+        name = PLAYER_PROPERTIES.get(key)
+        if name is None:
+            continue
+        if type(value) is Variant:
+            value = value.value
+        if name == "metadata":
+            value = TrackSnapshot.from_dbus_dict(value)
+        elif name == "playback_status":
+            value = _enum_value(_PLAYBACK_STATUSES, key, value)
+        elif name == "loop_status":
+            value = _enum_value(_LOOP_STATUSES, key, value)
+        processed_data[name] = value
+    return processed_data
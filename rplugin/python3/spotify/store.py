@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import replace
+from typing import Any
+from typing import final
+
+from .clock import PlaybackClock
+from .mpris import PLAYER_PROPERTIES
+from .mpris import PlaybackStatus
+from .snapshot import PlayerSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+@final
+class PlayerStateStore:
+    """
+    Authoritative in-memory player state, kept current by merging the payloads
+    of PropertiesChanged signals instead of re-querying the player.
+    """
+
+    def __init__(self, clock: PlaybackClock | None = None):
+        self._state: PlayerSnapshot | None = None
+        # Shared by every stored snapshot to interpolate the position
+        self.clock = clock or PlaybackClock()
+        self.merged_signals = 0
+        self.full_fetches = 0
+
+    @property
+    def state(self) -> PlayerSnapshot | None:
+        return self._state
+
+    def replace(self, state: PlayerSnapshot) -> None:
+        """Store a state obtained from a full fetch."""
+        # Freshly fetched and not shared yet, so attaching the clock is safe
+        state.clock = self.clock
+        self.clock.sync(state.position)
+        self.clock.update(
+            playing=state.is_playing(), rate=state.rate, length=state.metadata.length
+        )
+        self._state = state
+        self.full_fetches += 1
+
+    def detached(self) -> PlayerSnapshot | None:
+        """A copy of the state at the current position, free to hand to another store."""
+        if self._state is None:
+            return None
+        return replace(self._state, position=self.clock.position(), clock=None)
+
+    def clear(self) -> None:
+        """Forget the current state so the next change forces a full fetch."""
+        self._state = None
+        self.clock.update(playing=False)
+
+    def apply_changes(
+        self,
+        changed_properties: dict[str, Any],
+        invalidated_properties: list[str],
+    ) -> bool:
+        """
+        Merge a PropertiesChanged delta into the stored state.
+
+        Returns:
+            True if the delta was applied, False if a full fetch is required
+            because nothing is stored yet, a tracked property was invalidated
+            or the delta carries a value the snapshot can't represent.
+        """
+        if self._state is None:
+            return False
+        if any(name in PLAYER_PROPERTIES for name in invalidated_properties):
+            logger.debug("Invalidated properties %s", invalidated_properties)
+            return False
+
+        try:
+            self._merge(changed_properties)
+        except ValueError as e:
+            logger.warning("Ignoring unusable PropertiesChanged delta: %s", e)
+            return False
+        self.merged_signals += 1
+        return True
+
+    def apply_prediction(self, changes: dict[str, Any]) -> None:
+        """Merge the expected effect of a command, ahead of the player's signal."""
+        if self._state is not None:
+            self._merge(changes)
+
+    def _merge(self, changed_properties: dict[str, Any]) -> None:
+        assert self._state is not None
+        previous = self._state
+        state = previous.with_dbus_changes(changed_properties)
+        self._state = state
+
+        if state.metadata.track_id != previous.metadata.track_id:
+            # A new track starts from the top; no need to ask the player
+            self.clock.sync(0)
+        if (
+            state.playback_status != previous.playback_status
+            and state.playback_status == PlaybackStatus.STOPPED
+        ):
+            self.clock.sync(0)
+        self.clock.update(
+            playing=state.is_playing(), rate=state.rate, length=state.metadata.length
+        )
+
+    def seeked(self, position: int) -> None:
+        """Resync the clock from a Seeked signal."""
+        self.clock.sync(position)
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import Any
+from typing import final
+
+from dbus_fast import ErrorType
+from dbus_fast import Message
+from dbus_fast import MessageType
+from dbus_fast.aio import MessageBus
+from dbus_fast.errors import DBusError
+from dbus_fast.signature import Variant
+
+logger = logging.getLogger(__name__)
+
+DBUS_NAME = "org.freedesktop.DBus"
+DBUS_PATH = "/org/freedesktop/DBus"
+PROPERTIES = "org.freedesktop.DBus.Properties"
+
+PropertiesChangedHandler = Callable[[str, dict[str, Variant], list[str]], None]
+SeekedHandler = Callable[[int], None]
+NameOwnerChangedHandler = Callable[[str, str, str], None]
+
+
+@final
+class SignalSubscriptions:
+    """
+    The player signals we listen to, filtered by the bus daemon.
+
+    dbus_fast's proxy signals match on sender, path and interface only, so the
+    daemon would deliver PropertiesChanged for every interface of the player,
+    and its name-owner cache subscribes to NameOwnerChanged for every name on
+    the bus. Instead, one match rule per signal narrows delivery down to Player
+    PropertiesChanged (via arg0), Player.Seeked and ownership changes of the
+    player's own bus name; anything else is dropped before it reaches us.
+    """
+
+    def __init__(self, service: str, path: str, player_interface: str):
+        """
+        Args:
+            service: Well-known bus name of the player.
+            path: Object path of the player.
+            player_interface: The MPRIS Player interface name.
+        """
+        self.service = service
+        self.path = path
+        self.player_interface = player_interface
+        self._bus: MessageBus | None = None
+        self._properties_changed_handlers: list[PropertiesChangedHandler] = []
+        self._seeked_handlers: list[SeekedHandler] = []
+        self._name_owner_changed_handlers: list[NameOwnerChangedHandler] = []
+
+        self.received = 0
+        self.acted = 0
+
+    def match_rules(self) -> list[str]:
+        return [
+            f"type='signal',sender='{self.service}',path='{self.path}',"
+            f"interface='{PROPERTIES}',member='PropertiesChanged',"
+            f"arg0='{self.player_interface}'",
+            f"type='signal',sender='{self.service}',path='{self.path}',"
+            f"interface='{self.player_interface}',member='Seeked'",
+            f"type='signal',sender='{DBUS_NAME}',path='{DBUS_PATH}',"
+            f"interface='{DBUS_NAME}',member='NameOwnerChanged',"
+            f"arg0='{self.service}'",
+        ]
+
+    async def install(self, bus: MessageBus) -> None:
+        """Add the match rules and the message handler to `bus`, once per bus."""
+        if self._bus is bus:
+            return
+        for rule in self.match_rules():
+            await self._bus_call(bus, "AddMatch", rule)
+        bus.add_message_handler(self._on_message)
+        self._bus = bus
+        logger.debug("Installed match rules for %s.", self.service)
+
+    async def remove(self) -> None:
+        """Undo install() on a bus that stays connected."""
+        bus, self._bus = self._bus, None
+        if bus is None or not bus.connected:
+            return
+        bus.remove_message_handler(self._on_message)
+        for rule in self.match_rules():
+            await self._bus_call(bus, "RemoveMatch", rule)
+
+    def reset(self) -> None:
+        """Forget the bus after it disconnected; its match rules went with it."""
+        self._bus = None
+
+    @staticmethod
+    async def _bus_call(bus: MessageBus, member: str, rule: str) -> None:
+        reply = await bus.call(
+            Message(
+                destination=DBUS_NAME,
+                path=DBUS_PATH,
+                interface=DBUS_NAME,
+                member=member,
+                signature="s",
+                body=[rule],
+            )
+        )
+        assert reply is not None
+        if reply.message_type == MessageType.ERROR:
+            raise DBusError(reply.error_name or ErrorType.FAILED, *reply.body[:1])
+
+    def add_properties_changed_handler(self, handler: PropertiesChangedHandler) -> None:
+        self._properties_changed_handlers.append(handler)
+
+    def add_seeked_handler(self, handler: SeekedHandler) -> None:
+        self._seeked_handlers.append(handler)
+
+    def add_name_owner_changed_handler(self, handler: NameOwnerChangedHandler) -> None:
+        self._name_owner_changed_handlers.append(handler)
+
+    def _on_message(self, msg: Message) -> None:
+        if msg.message_type != MessageType.SIGNAL:
+            return
+        self.received += 1
+        body: list[Any] = msg.body
+        if msg.member == "PropertiesChanged":
+            if msg.path != self.path or body[0] != self.player_interface:
+                return
+            self.acted += 1
+            for handler in self._properties_changed_handlers:
+                handler(body[0], body[1], body[2])
+        elif msg.member == "Seeked":
+            if msg.path != self.path or msg.interface != self.player_interface:
+                return
+            self.acted += 1
+            for handler in self._seeked_handlers:
+                handler(body[0])
+        elif msg.member == "NameOwnerChanged":
+            if msg.sender != DBUS_NAME or body[0] != self.service:
+                return
+            self.acted += 1
+            for handler in self._name_owner_changed_handlers:
+                handler(body[0], body[1], body[2])
+
+    def stats(self) -> dict[str, int]:
+        return {"received": self.received, "acted": self.acted}
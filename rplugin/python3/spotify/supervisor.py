@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from collections.abc import Callable
+from collections.abc import Coroutine
+from collections.abc import Hashable
+from typing import Any
+from typing import final
+
+from .interface import PlayerNotRunning
+from .interface import Spotify
+from .runner import Spawn
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerUnavailable(ConnectionError):
+    """Raised without connecting while a reconnect is waiting out its backoff."""
+
+
+@final
+class ConnectionSupervisor:
+    """
+    Keeps a Spotify client attached whenever the player is running.
+
+    The player's NameOwnerChanged signal drives the connection: the proxy is
+    attached the moment the player's bus name gets an owner and dropped when it
+    loses it. Transient failures (no session bus, a failed introspection, the
+    bus dropping) are retried with capped exponential backoff. While the player
+    is known to be gone or a retry is pending, ensure_connected() fails fast
+    without any D-Bus traffic. Must be used from the thread running `loop`.
+    """
+
+    def __init__(
+        self,
+        spotify: Spotify,
+        loop: asyncio.AbstractEventLoop,
+        on_change: Callable[[], None] | None = None,
+        initial_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        spawn: Spawn | None = None,
+    ):
+        """
+        Args:
+            spotify: The client to keep attached.
+            loop: The event loop retries are scheduled on.
+            on_change: Called after an attach made in the background, and when
+                       the player or the bus goes away.
+            initial_backoff: Seconds before the first retry after a failure.
+            max_backoff: Cap on the doubling delay between retries.
+            spawn: Runs the background attach ("attach") and bus watch
+                   ("watch") tasks, e.g. through an AsyncRunner group; plain
+                   tasks on `loop` by default.
+        """
+        self._spotify = spotify
+        self._loop = loop
+        self._on_change = on_change
+        self._spawn = spawn or self._create_task
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self._backoff = initial_backoff
+        self._retry_timer: asyncio.TimerHandle | None = None
+        self._watcher: asyncio.Task[None] | None = None
+        self._stopped = False
+        spotify.add_name_owner_changed_handler(self._on_name_owner_changed)
+
+        self.attaches = 0
+        self.failures = 0
+        self.fast_fails = 0
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._cancel_retry()
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def ensure_connected(self) -> Spotify:
+        """
+        The attached client, attaching on demand unless the player is known to
+        be gone or a retry is pending.
+
+        Raises:
+            PlayerNotRunning: The player's bus name has no owner.
+            PlayerUnavailable: A failed attempt is waiting out its backoff.
+        """
+        if self._spotify.connected:
+            return self._spotify
+        if self._spotify.player_running is False:
+            self.fast_fails += 1
+            raise PlayerNotRunning(str(self._spotify.service))
+        if self._retry_timer is not None:
+            self.fast_fails += 1
+            delay = self._retry_timer.when() - self._loop.time()
+            raise PlayerUnavailable(f"Reconnecting to the player in {delay:.1f}s")
+        return await self._attempt()
+
+    async def _attempt(self) -> Spotify:
+        try:
+            spotify = await self._spotify.ensure_connected()
+        except PlayerNotRunning:
+            # Not a failure: the bus is up and NameOwnerChanged will wake us
+            self._reset_backoff()
+            self._watch_bus()
+            raise
+        except Exception as e:
+            self.failures += 1
+            self._schedule_retry(e)
+            raise
+        self._reset_backoff()
+        self.attaches += 1
+        self._watch_bus()
+        return spotify
+
+    def _create_task(
+        self, coro: Coroutine[Any, Any, None], key: Hashable | None = None
+    ) -> asyncio.Task[None]:
+        task = self._loop.create_task(coro, name=f"supervisor:{key}")
+        # The loop only keeps weak references to its tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _attach_soon(self) -> None:
+        self._spawn(self._attach_in_background(), key="attach")
+
+    async def _attach_in_background(self) -> None:
+        if self._stopped:
+            return
+        try:
+            await self._attempt()
+        except PlayerNotRunning:
+            logger.info("Player not running; waiting for it to appear.")
+            return
+        except Exception as e:
+            logger.debug(f"Background attach failed: {e}")
+            return
+        if self._on_change is not None:
+            self._on_change()
+
+    def _on_name_owner_changed(self, name: str, old_owner: str, new_owner: str) -> None:
+        if self._stopped:
+            return
+        if new_owner:
+            logger.info(f"{name} appeared; attaching.")
+            self._cancel_retry()
+            self._reset_backoff()
+            self._attach_soon()
+        else:
+            logger.info(f"{name} vanished.")
+            if self._on_change is not None:
+                self._on_change()
+
+    def _watch_bus(self) -> None:
+        if self._watcher is None or self._watcher.done():
+            self._watcher = self._spawn(self._watch(), key="watch")
+
+    async def _watch(self) -> None:
+        await self._spotify.wait_for_disconnect()
+        if self._stopped:
+            return
+        logger.warning("Bus connection dropped; reconnecting.")
+        self._schedule_retry(None)
+        if self._on_change is not None:
+            self._on_change()
+
+    def _schedule_retry(self, error: Exception | None) -> None:
+        if self._stopped or self._retry_timer is not None:
+            return
+        # Jitter keeps several Neovim instances from retrying in lockstep
+        delay = self._backoff * random.uniform(0.8, 1.2)
+        self._backoff = min(self._backoff * 2, self.max_backoff)
+        logger.info(f"Retrying connection in {delay:.1f}s (error: {error})")
+        self._retry_timer = self._loop.call_later(delay, self._retry)
+
+    def _retry(self) -> None:
+        self._retry_timer = None
+        self._attach_soon()
+
+    def _cancel_retry(self) -> None:
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+            self._retry_timer = None
+
+    def _reset_backoff(self) -> None:
+        self._backoff = self.initial_backoff
+
+    def stats(self) -> dict[str, int | bool | None]:
+        return {
+            "attaches": self.attaches,
+            "failures": self.failures,
+            "fast_fails": self.fast_fails,
+            "retry_pending": self._retry_timer is not None,
+            "player_running": self._spotify.player_running,
+        }
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from types import TracebackType
+from typing import Any
+from typing import final
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRACE_FILE = "/tmp/spotify_nvim.trace.json"
+
+
+def now_us() -> float:
+    """Trace timestamps: microseconds on CLOCK_MONOTONIC, like vim.uv.hrtime()."""
+    return time.monotonic_ns() / 1000
+
+
+@final
+class _Span:
+    __slots__ = ("_tracer", "_name", "_cat", "_args", "_started")
+
+    def __init__(self, tracer: Tracer, name: str, cat: str, args: dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._cat = cat
+        self._args = args
+        self._started = 0.0
+
+    def __enter__(self) -> None:
+        self._started = now_us()
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._tracer.complete(
+            self._name, self._cat, self._started, now_us() - self._started, self._args
+        )
+
+
+@final
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc_info: object) -> None:
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+@final
+class Tracer:
+    """
+    Opt-in span tracing in Chrome trace-event format.
+
+    Spans ("X" events) record where a thread spent time; an update's whole
+    life, from the signal or key press to the push to Lua, is an async span
+    under its update id, which the spans along the way carry in their args.
+    Events go to a ring buffer holding the last `capacity` of them and are
+    written out by dump(), for chrome://tracing or Perfetto. While disabled,
+    span() returns a shared no-op and nothing is recorded. Thread-safe.
+    """
+
+    def __init__(self, capacity: int = 20_000):
+        """
+        Args:
+            capacity: How many events the ring buffer keeps.
+        """
+        self.enabled = False
+        self._events: deque[dict[str, Any]] = deque(maxlen=capacity)
+        self._ids = itertools.count(1)
+        self._pid = os.getpid()
+        self._threads: dict[int, str] = {}
+        self._external: dict[str, int] = {}
+
+    def start(self) -> None:
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def span(self, name: str, cat: str = "plugin", **args: Any) -> _Span | _NullSpan:
+        """Time the enclosed block as one span on the current thread."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def complete(
+        self, name: str, cat: str, ts: float, dur: float, args: dict[str, Any]
+    ) -> None:
+        """Record a span that ran from `ts` for `dur` microseconds."""
+        self._record(
+            {"name": name, "cat": cat, "ph": "X", "ts": ts, "dur": dur, "args": args}
+        )
+
+    def instant(self, name: str, cat: str = "plugin", **args: Any) -> None:
+        if self.enabled:
+            self._record(
+                {
+                    "name": name,
+                    "cat": cat,
+                    "ph": "i",
+                    "s": "t",
+                    "ts": now_us(),
+                    "args": args,
+                }
+            )
+
+    def begin_update(self, source: str) -> int | None:
+        """Open the async span of a new update; its id, or None while disabled."""
+        if not self.enabled:
+            return None
+        update = next(self._ids)
+        self._async("b", update, source=source)
+        return update
+
+    def end_update(self, update: int, **args: Any) -> None:
+        """Close the async span of `update` once its effect reached Lua."""
+        self._async("e", update, **args)
+
+    def _async(self, phase: str, update: int, **args: Any) -> None:
+        self._record(
+            {
+                "name": "update",
+                "cat": "update",
+                "ph": phase,
+                "id": update,
+                "ts": now_us(),
+                "args": args,
+            }
+        )
+
+    def _record(self, event: dict[str, Any]) -> None:
+        tid = threading.get_ident()
+        if tid not in self._threads:
+            self._threads[tid] = threading.current_thread().name
+        event["pid"] = self._pid
+        event["tid"] = tid
+        self._events.append(event)
+
+    def add_events(self, events: list[dict[str, Any]], thread: str) -> None:
+        """Merge events recorded elsewhere, e.g. in Lua, under a named thread."""
+        # Small ids cannot clash with Python's thread idents
+        tid = self._external.setdefault(thread, len(self._external) + 1)
+        self._threads[tid] = thread
+        for event in events:
+            event["pid"] = self._pid
+            event["tid"] = tid
+            self._events.append(event)
+
+    def dump(self, path: str = DEFAULT_TRACE_FILE) -> int:
+        """Write the buffered events as Chrome trace JSON; returns how many."""
+        import json
+
+        events = sorted(list(self._events), key=lambda event: event["ts"])
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": self._pid,
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in list(self._threads.items())
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        logger.info("Wrote %d trace events to %s.", len(events), path)
+        return len(events)
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    def stats(self) -> dict[str, int | bool]:
+        return {
+            "enabled": self.enabled,
+            "events": len(self._events),
+            "capacity": self._events.maxlen or 0,
+        }
+
+
+# Shared by the modules along the signal-to-redraw path
+tracer = Tracer()